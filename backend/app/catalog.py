@@ -0,0 +1,207 @@
+"""
+Local recipe catalog: a DB mirror of TheMealDB recipes plus an in-memory
+inverted index from normalized ingredient name to recipe ids.
+
+Ingest TheMealDB JSON dumps (e.g. saved lookup.php / search.php responses):
+
+    python -m app.catalog ingest dumps/*.json
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .models.recipe import Recipe, RecipeIngredient
+
+# TheMealDB meals carry up to 20 strIngredientN / strMeasureN pairs
+MAX_MEALDB_INGREDIENTS = 20
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_ingredient(name: str) -> str:
+    """
+    Canonical form used to match pantry items to recipe ingredients.
+    Lowercase, underscores -> spaces, collapsed whitespace, naive singular.
+    """
+    value = _WHITESPACE.sub(" ", (name or "").replace("_", " ").strip().lower())
+    if len(value) > 3:
+        if value.endswith("ies"):
+            value = value[:-3] + "y"
+        elif value.endswith("oes"):
+            value = value[:-2]
+        elif value.endswith("s") and not value.endswith(("ss", "us")):
+            value = value[:-1]
+    return value
+
+
+@dataclass(frozen=True)
+class RecipeSummary:
+    """The fields TheMealDB's filter.php returns, so results can stand in for upstream ones."""
+    id: int
+    name: str
+    thumbnail: Optional[str] = None
+    category: Optional[str] = None
+
+    def to_meal(self) -> dict:
+        return {"idMeal": str(self.id), "strMeal": self.name, "strMealThumb": self.thumbnail}
+
+
+class RecipeCatalog:
+    """In-memory inverted index over the local recipe mirror."""
+
+    def __init__(self):
+        self._recipes: dict[int, RecipeSummary] = {}
+        self._ingredients: dict[int, tuple[str, ...]] = {}
+        self._by_ingredient: dict[str, set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._recipes
+
+    def add(self, summary: RecipeSummary, ingredients: Iterable[str]) -> None:
+        normalized = tuple(dict.fromkeys(normalize_ingredient(i) for i in ingredients if i))
+        self._recipes[summary.id] = summary
+        self._ingredients[summary.id] = normalized
+        for name in normalized:
+            self._by_ingredient.setdefault(name, set()).add(summary.id)
+
+    def get(self, recipe_id: int) -> Optional[RecipeSummary]:
+        return self._recipes.get(recipe_id)
+
+    def ingredients_of(self, recipe_id: int) -> tuple[str, ...]:
+        """Normalized ingredient names of a recipe (empty if unknown)."""
+        return self._ingredients.get(recipe_id, ())
+
+    def recipes_with(self, ingredient: str) -> set[int]:
+        """Ids of recipes that use `ingredient`."""
+        return self._by_ingredient.get(normalize_ingredient(ingredient), set())
+
+    def match(self, ingredients: Iterable[str]) -> list[tuple[int, int]]:
+        """
+        Recipes using any of `ingredients`, as (recipe_id, matched_count),
+        most matches first (ties by recipe id).
+        """
+        counts: Counter = Counter()
+        for name in {normalize_ingredient(i) for i in ingredients}:
+            counts.update(self._by_ingredient.get(name, ()))
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+    async def load(self, db: AsyncSession) -> int:
+        """Rebuild the index from the recipes tables (two queries). Returns recipe count."""
+        recipes = (await db.execute(
+            select(Recipe.id, Recipe.name, Recipe.thumbnail, Recipe.category)
+        )).all()
+        ingredients = (await db.execute(
+            select(RecipeIngredient.recipe_id, RecipeIngredient.normalized_name)
+            .order_by(RecipeIngredient.recipe_id, RecipeIngredient.position)
+        )).all()
+        self._rebuild(recipes, ingredients)
+        return len(self)
+
+    def _rebuild(self, recipes, ingredients) -> None:
+        by_recipe: dict[int, list[str]] = {}
+        for recipe_id, name in ingredients:
+            by_recipe.setdefault(recipe_id, []).append(name)
+        fresh = RecipeCatalog()
+        for recipe_id, name, thumbnail, category in recipes:
+            fresh.add(RecipeSummary(recipe_id, name, thumbnail, category), by_recipe.get(recipe_id, ()))
+        # Swap in one step so concurrent readers never see a half-built index
+        self._recipes, self._ingredients, self._by_ingredient = (
+            fresh._recipes, fresh._ingredients, fresh._by_ingredient
+        )
+
+
+recipe_catalog = RecipeCatalog()
+
+
+def get_recipe_catalog() -> RecipeCatalog:
+    """Dependency for the shared catalog (app.dependency_overrides swaps in another instance)."""
+    return recipe_catalog
+
+
+# ======================================================
+# INGEST (TheMealDB JSON dumps -> recipes tables)
+# ======================================================
+
+def parse_meal(meal: dict) -> Recipe:
+    """Convert one TheMealDB meal object into a Recipe with its ingredients."""
+    recipe = Recipe(
+        id=int(meal["idMeal"]),
+        name=(meal.get("strMeal") or "").strip(),
+        category=meal.get("strCategory"),
+        area=meal.get("strArea"),
+        thumbnail=meal.get("strMealThumb"),
+        instructions=meal.get("strInstructions"),
+    )
+    seen = set()
+    for n in range(1, MAX_MEALDB_INGREDIENTS + 1):
+        name = (meal.get(f"strIngredient{n}") or "").strip()
+        if not name:
+            continue
+        normalized = normalize_ingredient(name)
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        recipe.ingredients.append(RecipeIngredient(
+            position=n,
+            ingredient_name=name,
+            normalized_name=normalized,
+            measure=(meal.get(f"strMeasure{n}") or "").strip() or None,
+        ))
+    return recipe
+
+
+def read_meals(path: str) -> list[dict]:
+    """Meals from a dump file: a TheMealDB response ({"meals": [...]}) or a bare list."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    meals = data.get("meals") if isinstance(data, dict) else data
+    return [m for m in (meals or []) if isinstance(m, dict) and m.get("idMeal")]
+
+
+def ingest_meals(db: Session, meals: Iterable[dict]) -> int:
+    """Insert or replace the given meals in one transaction. Returns recipes written."""
+    recipes = {}
+    for meal in meals:
+        recipe = parse_meal(meal)
+        recipes[recipe.id] = recipe  # later dumps win for duplicate ids
+    if not recipes:
+        return 0
+    ids = list(recipes)
+    db.execute(delete(RecipeIngredient).where(RecipeIngredient.recipe_id.in_(ids)))
+    db.execute(delete(Recipe).where(Recipe.id.in_(ids)))
+    db.add_all(recipes.values())
+    db.commit()
+    return len(recipes)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.catalog", description="Manage the local recipe catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest_cmd = sub.add_parser("ingest", help="Load TheMealDB JSON dump files into the recipes tables")
+    ingest_cmd.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    from .database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine, tables=[Recipe.__table__, RecipeIngredient.__table__])
+    meals = [meal for path in args.files for meal in read_meals(path)]
+    with SessionLocal() as db:
+        written = ingest_meals(db, meals)
+    print(f"Ingested {written} recipes from {len(args.files)} file(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,10 +31,101 @@ class Settings:
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+
+    # Authenticated-user cache (token subject -> principal)
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+    AUTH_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+    # Password hashing (Argon2 cost + process pool sizing).
+    # Defaults are passlib's argon2 defaults, so existing hashes keep their parameters;
+    # each in-flight hash needs ARGON2_MEMORY_COST KiB in its worker process.
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "4"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
     
+    # TheMealDB upstream
+    THEMEALDB_BASE_URL: str = os.getenv("THEMEALDB_BASE_URL", "https://www.themealdb.com/api/json/v1/1")
+    THEMEALDB_TIMEOUT_SECONDS: float = float(os.getenv("THEMEALDB_TIMEOUT_SECONDS", "10"))
+    THEMEALDB_MAX_CONNECTIONS: int = int(os.getenv("THEMEALDB_MAX_CONNECTIONS", "20"))
+    THEMEALDB_CACHE_TTL_SECONDS: float = float(os.getenv("THEMEALDB_CACHE_TTL_SECONDS", "300"))
+    THEMEALDB_CACHE_STALE_SECONDS: float = float(os.getenv("THEMEALDB_CACHE_STALE_SECONDS", "3600"))
+    THEMEALDB_CACHE_MAX_ENTRIES: int = int(os.getenv("THEMEALDB_CACHE_MAX_ENTRIES", "2048"))
+    RECIPE_SEARCH_CONCURRENCY: int = int(os.getenv("RECIPE_SEARCH_CONCURRENCY", "8"))
+
+    # Bulk endpoints
+    PANTRY_BULK_MAX_ITEMS: int = int(os.getenv("PANTRY_BULK_MAX_ITEMS", "200"))
+    GROCERY_LIST_MAX_ITEMS: int = int(os.getenv("GROCERY_LIST_MAX_ITEMS", "500"))
+
+    # Serialization: skip re-validating ORM rows against their response schema
+    TRUSTED_OUTPUT: bool = os.getenv("TRUSTED_OUTPUT", "true").lower() == "true"
+
+    # Background health probe behind /readyz and /health (database, optionally TheMealDB)
+    HEALTH_PROBE_INTERVAL_SECONDS: float = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "10"))
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "2"))
+    HEALTH_CHECK_UPSTREAM: bool = os.getenv("HEALTH_CHECK_UPSTREAM", "True").lower() == "true"
+
+    # SQL diagnostics: slow-query log threshold (0 disables) and X-DB-Queries / X-DB-Time headers
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+    SQL_DEBUG_HEADERS: bool = os.getenv("SQL_DEBUG_HEADERS", "False").lower() == "true"
+
+    # Rate limiting ("N/SECONDS" token buckets; empty or 0 disables a limit)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_STORAGE_URL: str = os.getenv("RATE_LIMIT_STORAGE_URL", "memory://")
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    RATE_LIMIT_TRUST_FORWARDED: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "False").lower() == "true"
+    RATE_LIMIT_LOGIN_PER_IP: str = os.getenv("RATE_LIMIT_LOGIN_PER_IP", "20/60")
+    # Login account buckets are per (account, client IP) so nobody can lock a victim out;
+    # guessing one account's password from many IPs is bounded only by the per-IP limit
+    RATE_LIMIT_LOGIN_PER_ACCOUNT: str = os.getenv("RATE_LIMIT_LOGIN_PER_ACCOUNT", "10/300")
+    RATE_LIMIT_REGISTER_PER_IP: str = os.getenv("RATE_LIMIT_REGISTER_PER_IP", "10/3600")
+    RATE_LIMIT_REGISTER_PER_ACCOUNT: str = os.getenv("RATE_LIMIT_REGISTER_PER_ACCOUNT", "3/3600")
+    RATE_LIMIT_SUPPORT_PER_IP: str = os.getenv("RATE_LIMIT_SUPPORT_PER_IP", "5/60")
+    RATE_LIMIT_SUPPORT_PER_ACCOUNT: str = os.getenv("RATE_LIMIT_SUPPORT_PER_ACCOUNT", "10/3600")
+
+    # Per-user dietary preference cache
+    PREFERENCE_CACHE_TTL_SECONDS: int = int(os.getenv("PREFERENCE_CACHE_TTL_SECONDS", "300"))
+    PREFERENCE_CACHE_MAX_ENTRIES: int = int(os.getenv("PREFERENCE_CACHE_MAX_ENTRIES", "10000"))
+
+    # Shared favorites payloads (decoded copies kept in memory)
+    RECIPE_PAYLOAD_CACHE_MAX_ENTRIES: int = int(os.getenv("RECIPE_PAYLOAD_CACHE_MAX_ENTRIES", "2048"))
+
+    # Write-behind buffering
+    LAST_LOGIN_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("LAST_LOGIN_FLUSH_INTERVAL_SECONDS", "5"))
+    SUPPORT_QUEUE_MAX_PENDING: int = int(os.getenv("SUPPORT_QUEUE_MAX_PENDING", "1000"))
+    SUPPORT_FLUSH_BATCH_SIZE: int = int(os.getenv("SUPPORT_FLUSH_BATCH_SIZE", "200"))
+    SUPPORT_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("SUPPORT_FLUSH_INTERVAL_SECONDS", "1"))
+
+    # Connection pool (ignored for SQLite)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+    # "always" pings on every checkout, "idle" only after DB_POOL_PRE_PING_IDLE_SECONDS unused, "never" disables it
+    DB_POOL_PRE_PING: str = os.getenv("DB_POOL_PRE_PING", "idle").lower()
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = float(os.getenv("DB_POOL_PRE_PING_IDLE_SECONDS", "30"))
+
+    # Optional full URL (e.g. sqlite:///./local.db for local dev/tests); overrides DB_* components
+    DATABASE_URL_OVERRIDE: str = os.getenv("DATABASE_URL", "")
+
     @property
     def DATABASE_URL(self) -> str:
         """Construct a properly encoded database URL from components."""
+        if self.DATABASE_URL_OVERRIDE:
+            return self.DATABASE_URL_OVERRIDE
         password = quote_plus(self.DB_PASSWORD)
         return f"mysql+pymysql://{self.DB_USER}:{password}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """Same database as DATABASE_URL, using the asyncio driver (aiomysql / aiosqlite)."""
+        url = self.DATABASE_URL
+        scheme, sep, rest = url.partition("://")
+        backend = scheme.split("+", 1)[0]
+        if backend == "mysql":
+            return f"mysql+aiomysql{sep}{rest}"
+        if backend == "sqlite":
+            return f"sqlite+aiosqlite{sep}{rest}"
+        return url
 settings = Settings()
\ No newline at end of file
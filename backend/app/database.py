@@ -24,30 +24,206 @@
 #     finally:
 #         db.close()
 
-from sqlalchemy import create_engine, text
+import logging
+import re
+import time
+from collections import Counter
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
+from .metrics import Histogram, current_request_stats, record_db_time
 
-# Create engine using the DATABASE_URL property
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+
+class _CheckoutTimingMixin:
+    """Records how long each checkout waited for a connection (and how many timed out)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.checkout_timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            self.checkout_wait.observe(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_options(url: str, poolclass=None) -> dict:
+    """Engine keyword arguments appropriate for the database backend."""
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+
+
+def install_idle_pre_ping(sync_engine: Engine, idle_seconds: float) -> None:
+    """
+    Ping a pooled connection on checkout only if it sat idle for `idle_seconds`.
+
+    Connections that were just returned skip the extra round-trip that
+    pool_pre_ping=True would add to every checkout. A failed ping raises
+    DisconnectionError, which makes the pool discard it and connect again.
+    """
+
+    @event.listens_for(sync_engine, "checkin")
+    def _mark_checked_in(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            alive = sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            raise exc.DisconnectionError("Idle connection failed pre-ping")
+
+
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_SQL_PARAM = re.compile(r"%s|%\(\w+\)s|(?<!:):\w+|\$\d+")
+_SQL_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_REPEATED_ROWS = re.compile(r"(\((?:\?|\.\.\.)\))(?:\s*,\s*\1)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Statement shape without literal values, so occurrences of one query group together:
+    literals and bind markers become ?, IN lists become (...), repeated VALUES rows collapse.
+    """
+    sql = _SQL_STRING.sub("?", statement)
+    sql = _SQL_PARAM.sub("?", sql)
+    sql = _SQL_NUMBER.sub("?", sql)
+    sql = _SQL_PARAM_LIST.sub("(...)", sql)
+    sql = _SQL_REPEATED_ROWS.sub(r"\1, ...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class SlowQueryLog:
+    """Logs statements slower than a threshold and counts them by normalized text."""
+
+    MAX_TRACKED_STATEMENTS = 500
+
+    def __init__(self, threshold_seconds: float):
+        self.threshold_seconds = threshold_seconds
+        self.count = 0
+        self.by_statement: Counter = Counter()
+
+    def observe(self, statement: str, seconds: float) -> None:
+        if self.threshold_seconds <= 0 or seconds < self.threshold_seconds:
+            return
+        normalized = normalize_sql(statement)
+        self.count += 1
+        if normalized in self.by_statement or len(self.by_statement) < self.MAX_TRACKED_STATEMENTS:
+            self.by_statement[normalized] += 1
+        stats = current_request_stats.get()
+        slow_query_logger.warning(
+            "Slow query (%.1f ms%s): %s",
+            seconds * 1000,
+            f", query #{stats.db_queries} of this request" if stats else "",
+            normalized,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": round(self.threshold_seconds * 1000, 3),
+            "count": self.count,
+            "top_statements": dict(self.by_statement.most_common(10)),
+        }
+
+
+slow_queries = SlowQueryLog(settings.SLOW_QUERY_THRESHOLD_MS / 1000)
+
+
+def install_query_timing(sync_engine: Engine, slow_log: SlowQueryLog = slow_queries) -> None:
+    """
+    Count each statement and add its execution time to the current request's
+    RequestStats (see app.metrics.current_request_stats); log slow ones.
+    """
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        record_db_time(elapsed)
+        slow_log.observe(statement, elapsed)
+
+
+# Create engine using the DATABASE_URL property (sync; used by scripts and tooling)
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=False  # Set to True for SQL debugging
+    echo=False,  # Set to True for SQL debugging
+    **_engine_options(settings.DATABASE_URL, InstrumentedQueuePool)
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API routers (aiomysql for MySQL, aiosqlite for SQLite)
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    echo=False,
+    **_engine_options(settings.ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool)
+)
+
+install_query_timing(engine)
+install_query_timing(async_engine.sync_engine)
+
+if settings.DB_POOL_PRE_PING == "idle" and not settings.DATABASE_URL.startswith("sqlite"):
+    install_idle_pre_ping(engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+    install_idle_pre_ping(async_engine.sync_engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+
+# expire_on_commit=False: objects stay readable after commit without an implicit
+# (and, under asyncio, illegal) lazy reload.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Create Base class for models
 Base = declarative_base()
 
 # Dependency to get DB session
 def get_db():
     """
-    Dependency function to get database session.
-    Use this in FastAPI route dependencies.
+    Dependency function to get a synchronous database session.
+    Kept for scripts and sync code paths; API routes use get_async_db.
     """
     db = SessionLocal()
     try:
@@ -55,15 +231,44 @@ def get_db():
     finally:
         db.close()
 
+
+async def get_async_db():
+    """
+    Dependency function to get an AsyncSession.
+    Use this in FastAPI route dependencies.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def pool_status(target=None) -> dict:
+    """Snapshot of connection pool usage (defaults to the async engine used by the API)."""
+    target = target if target is not None else async_engine
+    if isinstance(target, AsyncEngine):
+        target = target.sync_engine
+    pool = target.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout_seconds": pool.timeout(),
+        })
+    if isinstance(pool, _CheckoutTimingMixin):
+        status["checkout_timeouts"] = pool.checkout_timeouts
+        status["checkout_wait_seconds"] = pool.checkout_wait.snapshot()
+    return status
+
 # Function to test database connection
 def test_connection():
     """Test database connection"""
     try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
-        print("✅ Database connection successful!")
+        with SessionLocal() as db:
+            db.execute(text("SELECT 1"))
+        logger.info("Database connection successful")
         return True
     except Exception as e:
-        print(f"❌ Database connection failed: {e}")
+        logger.error("Database connection failed: %s", e)
         return False
\ No newline at end of file
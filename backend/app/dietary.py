@@ -0,0 +1,275 @@
+"""
+Server-side dietary filtering.
+
+Each preference type (vegan, vegetarian, gluten_free, dairy_free, nut_free)
+maps to exclusion keywords (ported from the frontend's brute-force checks in
+frontend/api.js). For a user's preference set the keywords are compiled once
+into Aho-Corasick automata, so checking a recipe is a single linear pass over
+its text no matter how many keywords are involved.
+
+Keywords match whole words, optionally followed by "s"/"es"/"ed": "egg"
+matches "eggs" but not "eggplant", "nut" matches "nuts" but not "nutmeg",
+"cream" matches "creamed". Each keyword is also compiled in its
+normalize_ingredient form, since catalog ingredient names are stored
+singularized ("rolled oat", "breadcrumb").
+A keyword inside one of its KEYWORD_EXCEPTIONS phrases ("milk" in "coconut
+milk") does not count.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from .catalog import RecipeCatalog, normalize_ingredient
+
+_MEAT = [
+    "meat", "steak", "mince", "minced", "ground beef", "meatball", "beef", "veal", "pork", "ham",
+    "bacon", "rib", "sausage", "salami", "prosciutto", "chorizo", "lamb", "mutton", "goat", "duck",
+    "goose", "turkey", "chicken", "wing", "drumstick", "breast",
+]
+_SEAFOOD = [
+    "fish", "salmon", "tuna", "cod", "haddock", "sardine", "anchovy", "anchovies", "prawn", "shrimp",
+    "crab", "lobster", "clam", "mussel", "oyster", "seafood",
+]
+_DAIRY = [
+    "milk", "cheese", "mozzarella", "cheddar", "parmesan", "feta", "halloumi", "ricotta", "cream",
+    "butter", "buttermilk", "ghee", "yogurt", "yoghurt", "kefir", "custard", "whey", "casein",
+    "condensed milk", "evaporated milk",
+]
+_NUTS = [
+    "almond", "walnut", "hazelnut", "cashew", "pecan", "peanut", "groundnut", "pistachio", "macadamia",
+    "brazil nut", "pine nut", "chestnut", "nut",
+]
+
+# Matched against ingredient names + category (catalog recipes only)
+INGREDIENT_KEYWORDS = {
+    "vegetarian": _MEAT + _SEAFOOD + ["gelatin", "gelatine", "lard", "tallow"],
+    "vegan": _MEAT + _SEAFOOD + _DAIRY + [
+        "egg", "mayonnaise", "mayo", "gelatin", "gelatine", "honey", "lard", "tallow",
+    ],
+    "gluten_free": [
+        "wheat", "barley", "rye", "spelt", "bulgur", "semolina", "triticale", "farro", "kamut", "oats",
+        "flour", "self raising", "self-raising", "bread", "baguette", "roll", "bap", "pita", "tortilla",
+        "naan", "focaccia", "pasta", "spaghetti", "penne", "lasagna", "lasagne", "noodle", "udon", "ramen",
+        "macaroni", "couscous", "cracker", "breadcrumbs", "panko", "biscuit", "cookie", "cake",
+        "pastry", "pastries", "pie crust", "shortcrust",
+    ],
+    "dairy_free": _DAIRY,
+    "nut_free": _NUTS,
+}
+
+# Matched against the recipe name (all recipes, including ones not in the catalog)
+NAME_KEYWORDS = {
+    "vegetarian": [
+        "beef", "steak", "burger", "meatball", "pork", "ham", "bacon", "sausage", "lamb", "mutton",
+        "goat", "duck", "turkey", "chicken", "wing", "fish", "salmon", "tuna", "prawn", "shrimp",
+        "crab", "lobster", "anchovy", "anchovies",
+    ],
+    "vegan": [
+        "beef", "steak", "burger", "meatball", "pork", "ham", "bacon", "sausage", "lamb", "mutton",
+        "goat", "duck", "turkey", "chicken", "wing", "fish", "salmon", "tuna", "prawn", "shrimp",
+        "crab", "lobster", "anchovy", "anchovies", "egg", "omelette", "cheese", "cream", "milk",
+        "butter", "yogurt", "yoghurt", "honey",
+    ],
+    "gluten_free": [
+        "bread", "bun", "pasta", "spaghetti", "noodle", "ramen", "lasagna", "lasagne", "pie", "pizza",
+        "cake", "cookie", "biscuit", "tart", "sandwich",
+    ],
+    "dairy_free": ["cheese", "cream", "creamy", "alfredo", "milk", "yogurt", "yoghurt", "butter"],
+    "nut_free": _NUTS,
+}
+
+# Phrases that contain a keyword without being what it excludes, mapped to the
+# one keyword they excuse: "peanut butter" is not dairy, but still trips
+# nut_free through "peanut".
+KEYWORD_EXCEPTIONS = {
+    "coconut milk": "milk", "almond milk": "milk", "oat milk": "milk", "soy milk": "milk",
+    "soya milk": "milk", "rice milk": "milk", "cashew milk": "milk",
+    "coconut cream": "cream", "cream of tartar": "cream",
+    "coconut yogurt": "yogurt", "coconut yoghurt": "yoghurt", "soy yogurt": "yogurt",
+    "peanut butter": "butter", "almond butter": "butter", "cashew butter": "butter", "nut butter": "butter",
+    "cocoa butter": "butter", "apple butter": "butter", "butter bean": "butter",
+    "vegan butter": "butter", "vegan cheese": "cheese", "vegan mayonnaise": "mayonnaise", "vegan mayo": "mayo",
+    "water chestnut": "chestnut",
+    "rice flour": "flour", "corn flour": "flour", "almond flour": "flour", "coconut flour": "flour",
+    "chickpea flour": "flour", "rice noodle": "noodle", "corn tortilla": "tortilla",
+}
+
+SUPPORTED_PREFERENCES = frozenset(INGREDIENT_KEYWORDS)
+
+
+def normalize_preference(value: str) -> str:
+    """'Gluten-Free' / 'gluten free' -> 'gluten_free'."""
+    return value.strip().lower().replace("-", "_").replace(" ", "_")
+
+
+def _is_word_start(text: str, start: int) -> bool:
+    return start == 0 or not text[start - 1].isalnum()
+
+
+def _is_word_end(text: str, end: int) -> bool:
+    n = len(text)
+    if end == n or not text[end].isalnum():
+        return True
+    # allow a plural or past-participle suffix: "egg" -> "eggs", "tomato" -> "tomatoes", "cream" -> "creamed"
+    for suffix in ("s", "es", "ed"):
+        stop = end + len(suffix)
+        if text.startswith(suffix, end) and (stop == n or not text[stop].isalnum()):
+            return True
+    return False
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lowercase keywords with whole-word matching.
+
+    `exceptions` maps phrases to the keyword they excuse; both go into the
+    same automaton, and a keyword match lying inside a match of one of its
+    exception phrases is ignored.
+    """
+
+    def __init__(self, keywords: Iterable[str], exceptions: Optional[dict[str, str]] = None):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[str, ...]] = [()]
+        self.keywords = sorted({k.strip().lower() for k in keywords if k and k.strip()})
+        self._exceptions = {
+            phrase.strip().lower(): keyword
+            for phrase, keyword in (exceptions or {}).items()
+            if keyword in self.keywords and phrase.strip().lower() not in self.keywords
+        }
+        # Keywords whose match can only be reported once the text is fully scanned
+        self._excusable = frozenset(self._exceptions.values())
+
+        for keyword in self.keywords + sorted(self._exceptions):
+            state = 0
+            for ch in keyword:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[state][ch] = nxt
+                state = nxt
+            self._out[state] += (keyword,)
+
+        # Breadth-first pass to fill failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Optional[str]:
+        """A keyword occurring in `text` as a whole word, or None. `text` must be lowercase."""
+        goto, fail, out = self._goto, self._fail, self._out
+        exceptions, excusable = self._exceptions, self._excusable
+        pending: list[tuple[int, int, str]] = []  # excusable keyword matches
+        excused: list[tuple[int, int, str]] = []  # exception phrase matches
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                for keyword in out[state]:
+                    start = end - len(keyword)
+                    if not (_is_word_start(text, start) and _is_word_end(text, end)):
+                        continue
+                    if keyword in exceptions:
+                        excused.append((start, end, exceptions[keyword]))
+                    elif keyword in excusable:
+                        # An exception phrase may still end later ("butter" in "butter beans")
+                        pending.append((start, end, keyword))
+                    else:
+                        return keyword
+        for start, end, keyword in pending:
+            if not any(s <= start and end <= e and k == keyword for s, e, k in excused):
+                return keyword
+        return None
+
+
+def _with_normalized_forms(keywords: Iterable[str]) -> set[str]:
+    """Keywords plus their normalize_ingredient forms ("oats" -> "oat")."""
+    keywords = set(keywords)
+    return keywords | {normalize_ingredient(k) for k in keywords}
+
+
+def _normalized_exceptions() -> dict[str, str]:
+    exceptions = dict(KEYWORD_EXCEPTIONS)
+    for phrase, keyword in KEYWORD_EXCEPTIONS.items():
+        exceptions.setdefault(normalize_ingredient(phrase), keyword)
+    return exceptions
+
+
+class DietaryFilter:
+    """Compiled exclusion automata for one set of dietary preferences."""
+
+    def __init__(self, preferences: frozenset):
+        self.preferences = preferences
+        exceptions = _normalized_exceptions()
+        self._name_automaton = KeywordAutomaton(
+            _with_normalized_forms(k for p in preferences for k in NAME_KEYWORDS.get(p, ())), exceptions
+        )
+        self._ingredient_automaton = KeywordAutomaton(
+            _with_normalized_forms(k for p in preferences for k in INGREDIENT_KEYWORDS.get(p, ())), exceptions
+        )
+
+    @property
+    def active(self) -> bool:
+        return bool(self.preferences)
+
+    def violation(self, name: str, ingredients: Iterable[str] = (), category: Optional[str] = None) -> Optional[str]:
+        """The first excluded keyword found in the recipe, or None if it is compliant."""
+        if not self.preferences:
+            return None
+        found = self._name_automaton.find((name or "").lower())
+        if found:
+            return found
+        text = "\n".join(list(ingredients) + [category or ""]).lower()
+        return self._ingredient_automaton.find(text)
+
+    def allows(self, name: str, ingredients: Iterable[str] = (), category: Optional[str] = None) -> bool:
+        return self.violation(name, ingredients, category) is None
+
+    def filter_meals(self, meals: Iterable[dict], catalog: RecipeCatalog) -> list[dict]:
+        """
+        Keep TheMealDB meal dicts that comply with the preferences.
+        Ingredients/category come from the local catalog when it knows the recipe;
+        otherwise only the name can be checked.
+        """
+        meals = list(meals)
+        if not self.preferences:
+            return meals
+        kept = []
+        for meal in meals:
+            try:
+                recipe_id = int(meal.get("idMeal"))
+            except (TypeError, ValueError):
+                recipe_id = None
+            summary = catalog.get(recipe_id) if recipe_id is not None else None
+            if self.allows(
+                meal.get("strMeal") or "",
+                catalog.ingredients_of(recipe_id) if summary else (),
+                meal.get("strCategory") or (summary.category if summary else None),
+            ):
+                kept.append(meal)
+        return kept
+
+
+@lru_cache(maxsize=64)
+def _compile(preferences: frozenset) -> DietaryFilter:
+    return DietaryFilter(preferences)
+
+
+def compile_filter(preferences: Iterable[str]) -> DietaryFilter:
+    """Cached DietaryFilter for a user's preferences (unsupported values are ignored)."""
+    normalized = frozenset(normalize_preference(p) for p in preferences if p) & SUPPORTED_PREFERENCES
+    return _compile(normalized)
@@ -0,0 +1,160 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from .metrics import Histogram
+
+# Argon2 is deliberately slow (tens to hundreds of ms), so hashing runs in a
+# dedicated process pool: it keeps the GIL and FastAPI's threadpool free for
+# normal requests, and a bounded number of in-flight jobs gives backpressure.
+
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def build_crypt_context(time_cost: int, memory_cost: int, parallelism: int) -> CryptContext:
+    """CryptContext for Argon2 with explicit cost parameters."""
+    return CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__time_cost=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+
+
+# ---- functions executed inside worker processes ----
+
+_worker_context: Optional[CryptContext] = None
+
+
+def _init_worker(time_cost: int, memory_cost: int, parallelism: int) -> None:
+    global _worker_context
+    _worker_context = build_crypt_context(time_cost, memory_cost, parallelism)
+
+
+def _hash_in_worker(password: str) -> str:
+    return _worker_context.hash(password)
+
+
+def _verify_in_worker(password: str, hashed: str) -> bool:
+    try:
+        return _worker_context.verify(password, hashed)
+    except Exception:
+        return False
+
+
+class PasswordHasher:
+    """
+    Bounded Argon2 hashing service backed by a process pool.
+
+    At most `max_pending` jobs may be queued or running; beyond that callers
+    get an immediate 503 instead of piling up behind the pool.
+    With `workers=0` jobs run inline in the calling thread (same limits apply).
+    """
+
+    def __init__(self, workers: int, max_pending: int, time_cost: int, memory_cost: int, parallelism: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._params = (time_cost, memory_cost, parallelism)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # pending/rejected change on request threads and in executor callbacks
+        self._counter_lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+        self.timings = {"hash": Histogram(HASH_BUCKETS), "verify": Histogram(HASH_BUCKETS)}
+
+    # ---- pool lifecycle ----
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # "spawn" avoids forking a process that already runs threads (uvicorn, threadpool)
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=self._params,
+                    )
+        return self._executor
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    # ---- job submission ----
+
+    def _submit(self, operation: str, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._counter_lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        with self._counter_lock:
+            self.pending += 1
+        started = time.perf_counter()
+
+        def _release() -> None:
+            with self._counter_lock:
+                self.pending -= 1
+            self._slots.release()
+
+        def _done(_future: Future) -> None:
+            _release()
+            self.timings[operation].observe(time.perf_counter() - started)
+
+        if self.workers > 0:
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except Exception:
+                _release()
+                raise
+        else:
+            if _worker_context is None:
+                _init_worker(*self._params)
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+        future.add_done_callback(_done)
+        return future
+
+    def hash(self, password: str) -> str:
+        """Hash a password, blocking the calling thread (GIL released while waiting)."""
+        return self._submit("hash", _hash_in_worker, password).result()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password against an Argon2 hash, blocking the calling thread."""
+        return self._submit("verify", _verify_in_worker, password, hashed).result()
+
+    async def hash_async(self, password: str) -> str:
+        """Hash a password without blocking the event loop."""
+        return await asyncio.wrap_future(self._submit("hash", _hash_in_worker, password))
+
+    async def verify_async(self, password: str, hashed: str) -> bool:
+        """Verify a password without blocking the event loop."""
+        return await asyncio.wrap_future(self._submit("verify", _verify_in_worker, password, hashed))
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "hash_seconds": self.timings["hash"].snapshot(),
+            "verify_seconds": self.timings["verify"].snapshot(),
+        }
@@ -0,0 +1,195 @@
+"""
+Liveness / readiness state, kept fresh by a background probe.
+
+A task checks the database (SELECT 1 on one pooled connection) and
+TheMealDB every `interval` seconds; /readyz and /health only read the last
+result, so orchestrator probes never open connections or wait on I/O
+themselves. Pool saturation is read from the pool's in-memory counters at
+request time.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .config import settings
+from .database import async_engine, pool_status
+from .upstream import MealDBClient, UpstreamError, mealdb
+
+logger = logging.getLogger(__name__)
+
+
+def pool_saturation(status: dict) -> Optional[float]:
+    """Checked-out share of the pool's capacity (size + max_overflow), if the pool has a fixed size."""
+    capacity = status.get("size", 0) + status.get("max_overflow", 0)
+    if not capacity:
+        return None
+    return round(status["checked_out"] / capacity, 3)
+
+
+class HealthMonitor:
+    """
+    Cached database / TheMealDB probe results.
+
+    Readiness depends on the database only: TheMealDB being down degrades
+    recipe endpoints but the API can still serve everything else. A result
+    older than `stale_after` (three intervals by default, e.g. the probe
+    task died or the event loop is blocked) counts as not ready.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine = async_engine,
+        upstream: Optional[MealDBClient] = mealdb,
+        interval: float = 10.0,
+        timeout: float = 2.0,
+        stale_after: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._engine = engine
+        self._upstream = upstream
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after if stale_after is not None else 3 * interval
+        self._clock = clock
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.database: Optional[dict] = None
+        self.upstream: Optional[dict] = None
+        self._database_checked: Optional[float] = None
+        self.probes = 0
+
+    # ---- probes ----
+
+    async def _probe(self, name: str, check) -> dict:
+        started = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.timeout}s"
+        except Exception as exc:
+            error = str(exc) or type(exc).__name__
+        result = {
+            "ok": error is None,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "error": error,
+            "checked_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        }
+        previous = getattr(self, name)
+        if previous is None or previous["ok"] != result["ok"]:
+            # Log transitions only, so a steady state does not fill the logs
+            if result["ok"]:
+                logger.info("%s probe OK (%.1f ms)", name, result["latency_ms"])
+            else:
+                logger.warning("%s probe failed: %s", name, error)
+        setattr(self, name, result)
+        return result
+
+    async def _select_one(self) -> None:
+        async with self._engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _ping_upstream(self) -> None:
+        status_code = await self._upstream.ping()
+        if status_code >= 500:
+            raise UpstreamError(status_code)
+
+    async def check_database(self) -> dict:
+        result = await self._probe("database", self._select_one)
+        self._database_checked = self._clock()
+        self.probes += 1
+        return result
+
+    async def check_upstream(self) -> Optional[dict]:
+        if self._upstream is None:
+            return None
+        return await self._probe("upstream", self._ping_upstream)
+
+    async def check(self) -> None:
+        await asyncio.gather(self.check_database(), self.check_upstream())
+
+    # ---- cached state ----
+
+    def _age(self) -> Optional[float]:
+        if self._database_checked is None:
+            return None
+        return self._clock() - self._database_checked
+
+    async def _ensure_database_checked(self) -> None:
+        """
+        Without the background task (e.g. app used without its startup event),
+        check the database inline when there is no fresh result; TheMealDB is
+        never probed on the request path.
+        """
+        if self._task is not None:
+            return
+        age = self._age()
+        if age is not None and age <= self.stale_after:
+            return
+        async with self._lock:
+            age = self._age()
+            if age is None or age > self.stale_after:
+                await self.check_database()
+
+    async def readiness(self) -> tuple[bool, dict]:
+        await self._ensure_database_checked()
+        age = self._age()
+        fresh = age is not None and age <= self.stale_after
+        ready = fresh and bool(self.database and self.database["ok"])
+        pool = pool_status(self._engine)
+        return ready, {
+            "status": "ready" if ready else "not_ready",
+            "age_seconds": round(age, 3) if age is not None else None,
+            "database": self.database,
+            "upstream": self.upstream or {"ok": None, "error": "not checked yet"},
+            "pool": {**pool, "saturation": pool_saturation(pool)},
+        }
+
+    # ---- lifecycle ----
+
+    async def _run(self) -> None:
+        # start() has just checked the database; only TheMealDB is still unknown
+        probe = self.check_upstream
+        while True:
+            try:
+                await probe()
+            except Exception:
+                logger.exception("Health probe failed")
+            await asyncio.sleep(self.interval)
+            probe = self.check
+
+    async def start(self) -> None:
+        """Check the database once (so startup logs whether it is reachable), then probe periodically."""
+        if self._task is None:
+            await self.check_database()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "interval_seconds": self.interval,
+            "probes": self.probes,
+            "age_seconds": self._age(),
+        }
+
+
+health_monitor = HealthMonitor(
+    upstream=mealdb if settings.HEALTH_CHECK_UPSTREAM else None,
+    interval=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+)
@@ -1,16 +1,27 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base, test_connection
+from .catalog import recipe_catalog
+from .database import AsyncSessionLocal, async_engine, Base, pool_status, slow_queries
+from .health import health_monitor
 from .routers import auth_router, pantry_router
 from .routers import grocery_list  # import grocery list router
 from .routers import support_router, support_alias_router, preferences_router, recipes_router, favorites
 from .config import settings
+from .security import principal_cache, password_hasher
+from .payloads import payload_cache
+from .preference_store import preference_cache
+from .metrics import MetricsMiddleware, request_metrics
+from .rate_limit import RateLimitMiddleware, rate_limiter
+from .upstream import mealdb
+from .write_behind import last_login_buffer, support_queue
 
 # Create FastAPI app
 app = FastAPI(
     title="Easy Kitchen API",
     description="API for Easy Kitchen meal planning application",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 origins = [
@@ -20,6 +31,14 @@ origins = [
     "http://127.0.0.1:5000",
 ]
 
+# Middleware added later wraps the earlier ones. Rate limiting sits inside
+# CORS, so 429s still carry CORS headers; MetricsMiddleware (added last) is
+# the outermost layer and only observes, it never builds a response itself.
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=rate_limiter,
+    trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -27,7 +46,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-After-Id", "X-Next-Cursor", "X-DB-Queries", "X-DB-Time"],
 )
+# Outermost, so the recorded latency covers CORS, rate limiting and the full body
+app.add_middleware(MetricsMiddleware, metrics=request_metrics, debug_headers=settings.SQL_DEBUG_HEADERS)
 
 # Include routers
 app.include_router(auth_router)
@@ -50,14 +72,25 @@ def read_root():
     }
 
 @app.get("/health")
-def health_check():
-    """Health check endpoint"""
-    ok = test_connection()
+async def health_check():
+    """Health check endpoint (last background probe result; see /readyz for details)"""
+    ready, _ = await health_monitor.readiness()
     return {
-        "status": "healthy" if ok else "unhealthy",
-        "database": "connected" if ok else "error"
+        "status": "healthy" if ready else "unhealthy",
+        "database": "connected" if ready else "error"
     }
 
+@app.get("/livez")
+def liveness():
+    """Liveness probe: the process is serving requests. Never touches the database."""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness():
+    """Readiness probe from the cached background check: 503 if the database is down or the check is stale"""
+    ready, status = await health_monitor.readiness()
+    return ORJSONResponse(status, status_code=200 if ready else 503)
+
 @app.get("/config")
 def get_config():
     """Get configuration info (for debugging - remove in production)"""
@@ -68,6 +101,31 @@ def get_config():
         "use_supabase": settings.USE_SUPABASE
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Per-route request counts, latency, DB and TheMealDB time (Prometheus text format, this worker)"""
+    return PlainTextResponse(
+        request_metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+@app.get("/internal/stats")
+def internal_stats():
+    """Runtime counters for in-process caches and pools (for debugging/tuning - remove in production)"""
+    return {
+        "db_pool": pool_status(),
+        "health_probe": health_monitor.stats(),
+        "slow_queries": slow_queries.stats(),
+        "auth_cache": principal_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "last_login_buffer": last_login_buffer.stats(),
+        "support_queue": support_queue.stats(),
+        "themealdb": mealdb.stats(),
+        "recipe_payloads": payload_cache.stats(),
+        "preference_cache": preference_cache.stats(),
+        "rate_limit": rate_limiter.stats(),
+    }
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -81,15 +139,33 @@ async def startup_event():
     # Create tables and test connection at startup (not at import time)
     try:
         print("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
         print("✅ Database tables created successfully!")
     except Exception as e:
         print(f"⚠️ Could not create tables: {e}")
 
-    print("\nTesting database connection...")
-    test_connection()
+    # First database probe runs here (and is logged); then every HEALTH_PROBE_INTERVAL_SECONDS
+    await health_monitor.start()
+
+    try:
+        async with AsyncSessionLocal() as db:
+            count = await recipe_catalog.load(db)
+        print(f"✅ Recipe catalog loaded ({count} recipes)")
+    except Exception as e:
+        print(f"⚠️ Could not load recipe catalog: {e}")
+
+    last_login_buffer.start()
+    support_queue.start()
+    await mealdb.start()
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
-    print("\n Easy Kitchen API is shutting down...")
\ No newline at end of file
+    print("\n Easy Kitchen API is shutting down...")
+    await health_monitor.stop()
+    await last_login_buffer.stop()
+    await support_queue.stop()
+    await mealdb.close()
+    password_hasher.shutdown()
+    await async_engine.dispose()
\ No newline at end of file
@@ -0,0 +1,204 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+# Seconds. Covers fast cache hits up to slow upstream calls / password hashing.
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Prometheus-style histogram (count, sum and per-bucket counts).
+
+    Updates are not locked: record from a single thread (e.g. the event loop)
+    or accept that a rare concurrent increment may be lost.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative_buckets(self) -> list[tuple[str, int]]:
+        """[(upper_bound, cumulative_count), ...] ending with ("+Inf", count)."""
+        result = []
+        running = 0
+        for bound, n in zip(self.buckets, self._bucket_counts):
+            running += n
+            result.append((repr(bound), running))
+        result.append(("+Inf", running + self._bucket_counts[-1]))
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "max": round(self.max, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "buckets": dict(self.cumulative_buckets()),
+        }
+
+
+# ======================================================
+# PER-REQUEST METRICS (Prometheus text exposition at /metrics)
+# ======================================================
+
+@dataclass
+class RequestStats:
+    """Work done while serving the current request; filled in by DB / upstream hooks."""
+    db_seconds: float = 0.0
+    db_queries: int = 0
+    upstream_seconds: float = 0.0
+    upstream_calls: int = 0
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def record_db_time(seconds: float) -> None:
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.db_seconds += seconds
+        stats.db_queries += 1
+
+
+def record_upstream_time(seconds: float) -> None:
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.upstream_seconds += seconds
+        stats.upstream_calls += 1
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class RequestMetrics:
+    """
+    Per-route request counters and histograms for this worker process.
+
+    Recorded from the event loop only, so plain dicts/ints are enough: no locks
+    on the request path. Each worker exposes its own numbers.
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.in_progress = 0
+        self.requests: dict[tuple[str, str, str], int] = {}
+        self.duration: dict[tuple[str, str], Histogram] = {}
+        self.db_time: dict[tuple[str, str], Histogram] = {}
+        self.db_queries: dict[tuple[str, str], int] = {}
+        self.upstream_time: dict[tuple[str, str], Histogram] = {}
+
+    def _histogram(self, table: dict, key: tuple) -> Histogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self.buckets)
+        return histogram
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        status_key = (method, route, str(status))
+        self.requests[status_key] = self.requests.get(status_key, 0) + 1
+        self._histogram(self.duration, key).observe(seconds)
+        self._histogram(self.db_time, key).observe(stats.db_seconds)
+        self.db_queries[key] = self.db_queries.get(key, 0) + stats.db_queries
+        if stats.upstream_calls:
+            self._histogram(self.upstream_time, key).observe(stats.upstream_seconds)
+
+    def _render_histograms(self, lines: list, name: str, help_text: str, table: dict) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), histogram in sorted(table.items()):
+            labels = _labels(method=method, route=route)
+            for bound, count in histogram.cumulative_buckets():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP http_requests_in_progress Requests currently being served.",
+            "# TYPE http_requests_in_progress gauge",
+            f"http_requests_in_progress {self.in_progress}",
+            "# HELP http_requests_total Requests served, by route template and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+        self._render_histograms(
+            lines, "http_request_duration_seconds", "Time to serve a request, including the body.", self.duration
+        )
+        self._render_histograms(
+            lines, "http_request_db_seconds", "Time spent executing SQL per request.", self.db_time
+        )
+        lines.append("# HELP http_request_db_queries_total SQL statements executed, by route.")
+        lines.append("# TYPE http_request_db_queries_total counter")
+        for (method, route), count in sorted(self.db_queries.items()):
+            lines.append(f"http_request_db_queries_total{{{_labels(method=method, route=route)}}} {count}")
+        self._render_histograms(
+            lines, "http_request_upstream_seconds",
+            "Time spent waiting on TheMealDB per request (requests that called it).", self.upstream_time,
+        )
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording every HTTP request into a RequestMetrics."""
+
+    def __init__(self, app, metrics: RequestMetrics, debug_headers: bool = False):
+        self.app = app
+        self.metrics = metrics
+        # X-DB-Queries / X-DB-Time: work done before the response started
+        # (queries issued while a streamed body is sent are not included)
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500  # if the app raises before responding
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.debug_headers:
+                    message = {**message, "headers": [
+                        *message.get("headers", []),
+                        (b"x-db-queries", str(stats.db_queries).encode()),
+                        (b"x-db-time", f"{stats.db_seconds * 1000:.2f}ms".encode()),
+                    ]}
+            await send(message)
+
+        self.metrics.in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.metrics.in_progress -= 1
+            # Route template (e.g. /api/pantry/{ingredient_id}), never the raw path: bounded label values
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.metrics.observe(scope["method"], route, status, elapsed, stats)
+            current_request_stats.reset(token)
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,77 @@
+"""
+Schema upgrades for databases created by an earlier version.
+
+Base.metadata.create_all (run at startup) creates missing tables but never
+adds indexes to tables that already exist, so indexes introduced later
+(e.g. ix_grocery_lists_user_id_created_at, ix_grocery_list_items_grocery_list_id)
+must be created explicitly on existing deployments:
+
+    python -m app.migrate indexes [--dry-run]
+
+--dry-run prints the CREATE INDEX statements instead of running them (to
+hand to a DBA or schedule off-peak: building an index on a large table
+takes a while). Moving favorites to shared payloads has its own command,
+`python -m app.payloads migrate`; run it first. Indexes on columns the
+database does not have yet (favorites.payload_id before that migration) are
+skipped here rather than failing.
+"""
+
+import argparse
+import sys
+from typing import Optional
+
+from sqlalchemy import Index, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from . import models  # noqa: F401  (registers the model tables on Base.metadata)
+from .models import support_message  # noqa: F401  (not re-exported by app.models)
+from .database import Base
+
+
+def missing_indexes(engine: Engine) -> list[Index]:
+    """Indexes declared on the models but absent from existing tables (whose columns exist)."""
+    inspector = inspect(engine)
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue  # create_all will create it with its indexes
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [
+            index for index in table.indexes
+            if index.name not in existing and {column.name for column in index.columns} <= columns
+        ]
+    return sorted(missing, key=lambda index: index.name)
+
+
+def create_missing_indexes(engine: Engine, dry_run: bool = False) -> list[str]:
+    """Create (or with dry_run, only render) the missing indexes. Returns their DDL."""
+    indexes = missing_indexes(engine)
+    statements = [str(CreateIndex(index).compile(dialect=engine.dialect)).strip() for index in indexes]
+    if not dry_run:
+        with engine.begin() as conn:
+            for index in indexes:
+                index.create(conn)
+    return statements
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrate", description="Upgrade an existing database schema")
+    sub = parser.add_subparsers(dest="command", required=True)
+    indexes_cmd = sub.add_parser("indexes", help="Create indexes the models declare but the database lacks")
+    indexes_cmd.add_argument("--dry-run", action="store_true", help="print the DDL without running it")
+    args = parser.parse_args(argv)
+
+    from .database import engine
+
+    statements = create_missing_indexes(engine, dry_run=args.dry_run)
+    for statement in statements:
+        print(f"{statement};" if args.dry_run else f"Ran: {statement}")
+    if not statements:
+        print("All declared indexes exist")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,13 @@ from .user import User
 from .ingredient import UserIngredient
 from app.models.grocery_list import GroceryList, GroceryListItem
 from .user_preference import UserPreference
+from .recipe import Recipe, RecipeIngredient
+from .collection_version import CollectionVersion
+from .recipe_payload import RecipePayload
+from .favorite import FavoriteRecipe
 
-__all__ = ["User", "UserIngredient"]
+__all__ = [
+    "User", "UserIngredient", "Recipe", "RecipeIngredient", "CollectionVersion",
+    "RecipePayload", "FavoriteRecipe",
+]
 
@@ -0,0 +1,17 @@
+# backend/app/models/collection_version.py
+
+from sqlalchemy import Column, Integer, String, ForeignKey
+
+from ..database import Base
+
+
+class CollectionVersion(Base):
+    """
+    Per-user version counter for a collection ("pantry", "favorites", ...).
+    Bumped in the same transaction as every write; used to build ETags.
+    """
+    __tablename__ = "collection_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    collection = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,5 +1,6 @@
 from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
 from sqlalchemy import JSON
 from ..database import Base
 
@@ -9,10 +10,15 @@ class FavoriteRecipe(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     recipe_id = Column(String(50), nullable=False, index=True)
-    recipe_json = Column(JSON, nullable=False)
+    # Shared, deduplicated copy of the recipe (see app.payloads)
+    payload_id = Column(Integer, ForeignKey("recipe_payloads.id"), nullable=True, index=True)
+    # Legacy inline copy; NULL once migrated to payload_id
+    recipe_json = Column(JSON(none_as_null=True), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
 
+    payload = relationship("RecipePayload", lazy="raise")
+
     __table_args__ = (
         UniqueConstraint("user_id", "recipe_id", name="uq_user_recipe"),
     )
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -11,15 +11,21 @@ class GroceryList(Base):
     name = Column(String(100))
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    # relationship to grocery_list_items
-    items = relationship("GroceryListItem", back_populates="grocery_list")
+    # relationship to grocery_list_items (load with selectinload; lazy loads are N+1)
+    items = relationship("GroceryListItem", back_populates="grocery_list", order_by="GroceryListItem.id")
+
+    __table_args__ = (
+        # "my lists, newest first" (also serves plain user_id lookups).
+        # Existing databases: python -m app.migrate indexes
+        Index("ix_grocery_lists_user_id_created_at", "user_id", "created_at"),
+    )
 
 
 class GroceryListItem(Base):
     __tablename__ = "grocery_list_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    grocery_list_id = Column(Integer, ForeignKey("grocery_lists.id"))
+    grocery_list_id = Column(Integer, ForeignKey("grocery_lists.id"), index=True)
     ingredient_name = Column(String(100))
 
     grocery_list = relationship("GroceryList", back_populates="items")
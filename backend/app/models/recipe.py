@@ -0,0 +1,43 @@
+# backend/app/models/recipe.py
+
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from ..database import Base
+
+
+class Recipe(Base):
+    """Local mirror of a TheMealDB recipe (id is TheMealDB's idMeal)."""
+    __tablename__ = "recipes"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(200), nullable=False, index=True)
+    category = Column(String(100), index=True)
+    area = Column(String(100))
+    thumbnail = Column(String(255))
+    instructions = Column(Text)
+
+    ingredients = relationship(
+        "RecipeIngredient",
+        back_populates="recipe",
+        cascade="all, delete-orphan",
+        order_by="RecipeIngredient.position",
+    )
+
+
+class RecipeIngredient(Base):
+    __tablename__ = "recipe_ingredients"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    ingredient_name = Column(String(120), nullable=False)
+    # Lowercased/singularized form used for pantry matching (see app.catalog.normalize_ingredient)
+    normalized_name = Column(String(120), nullable=False, index=True)
+    measure = Column(String(120))
+
+    recipe = relationship("Recipe", back_populates="ingredients")
+
+    __table_args__ = (
+        UniqueConstraint("recipe_id", "position", name="unique_recipe_ingredient_position"),
+    )
@@ -0,0 +1,29 @@
+# backend/app/models/recipe_payload.py
+
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+
+from ..database import Base
+
+
+class RecipePayload(Base):
+    """
+    One stored copy of a recipe's JSON, shared by every favorite that points at it.
+    Keyed by (recipe_id, content_hash); `data` is the canonical JSON, compressed
+    according to `encoding` ("zstd", "zlib" or "identity").
+    """
+    __tablename__ = "recipe_payloads"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    recipe_id = Column(String(50), nullable=False)
+    content_hash = Column(String(64), nullable=False)  # sha256 of the canonical JSON
+    encoding = Column(String(16), nullable=False)
+    data = Column(LargeBinary(length=2 ** 24), nullable=False)  # MEDIUMBLOB on MySQL
+    # Denormalized for listings that don't need the whole payload
+    name = Column(String(255))
+    thumbnail = Column(String(512))
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("recipe_id", "content_hash", name="uq_recipe_payload"),
+    )
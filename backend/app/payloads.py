@@ -0,0 +1,263 @@
+"""
+Content-addressed storage for favorited recipe JSON.
+
+Each distinct recipe payload is stored once in `recipe_payloads`, keyed by
+(recipe_id, sha256 of its canonical JSON) and compressed with zstd when the
+optional `zstandard` package is installed (zlib otherwise). Favorites point at
+it through `favorites.payload_id` instead of carrying their own copy.
+
+Migrate an existing database (adds the column/table, then moves inline
+`favorites.recipe_json` copies into shared payloads in batches):
+
+    python -m app.payloads migrate [--batch-size 500]
+
+Run it before `python -m app.migrate indexes` and before starting the new
+version: the model selects favorites.payload_id, so favorites queries fail on
+a database that does not have the column yet.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import sys
+import zlib
+from typing import Iterable, Optional
+
+from sqlalchemy import MetaData, inspect, insert, select, text, tuple_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from .cache import TTLCache
+from .config import settings
+from .models.favorite import FavoriteRecipe
+from .models.recipe_payload import RecipePayload
+
+# Payloads smaller than this are stored uncompressed
+COMPRESS_MIN_BYTES = 256
+
+_zstd = None
+if importlib.util.find_spec("zstandard") is not None:
+    import zstandard as _zstd
+
+# Decoded payloads by id; rows are immutable, so entries never go stale
+payload_cache = TTLCache(maxsize=settings.RECIPE_PAYLOAD_CACHE_MAX_ENTRIES, ttl=24 * 3600)
+
+
+def canonical_json(recipe: dict) -> bytes:
+    """Stable serialization, so equal recipes hash equal regardless of key order."""
+    return json.dumps(recipe, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _encode(raw: bytes) -> tuple[str, bytes]:
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return "identity", raw
+    if _zstd is not None:
+        return "zstd", _zstd.ZstdCompressor(level=6).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decode_payload(encoding: str, data: bytes) -> dict:
+    if encoding == "zstd":
+        if _zstd is None:
+            raise RuntimeError("zstd-compressed recipe payload found but `zstandard` is not installed")
+        raw = _zstd.ZstdDecompressor().decompress(data)
+    elif encoding == "zlib":
+        raw = zlib.decompress(data)
+    else:
+        raw = data
+    return json.loads(raw)
+
+
+def _first_str(recipe: dict, *keys: str, max_length: int) -> Optional[str]:
+    for key in keys:
+        value = recipe.get(key)
+        if isinstance(value, str) and value:
+            return value[:max_length]
+    return None
+
+
+def prepare_payload(recipe_id: str, recipe: dict) -> dict:
+    """Column values for a recipe_payloads row."""
+    raw = canonical_json(recipe)
+    encoding, data = _encode(raw)
+    return {
+        "recipe_id": recipe_id,
+        "content_hash": hashlib.sha256(raw).hexdigest(),
+        "encoding": encoding,
+        "data": data,
+        # the frontend stores its formatted recipe ({name, thumbnail, ...}); raw TheMealDB uses str* keys
+        "name": _first_str(recipe, "name", "strMeal", max_length=255),
+        "thumbnail": _first_str(recipe, "thumbnail", "strMealThumb", max_length=512),
+    }
+
+
+def _insert_ignoring_duplicates(dialect_name: str, rows: list[dict]):
+    """Multi-row INSERT that skips payloads already stored (uq_recipe_payload)."""
+    if dialect_name == "mysql":
+        stmt = mysql_insert(RecipePayload).values(rows)
+        return stmt.on_duplicate_key_update(content_hash=stmt.inserted.content_hash)
+    if dialect_name in ("sqlite", "postgresql"):
+        upsert = sqlite_insert if dialect_name == "sqlite" else postgresql_insert
+        return upsert(RecipePayload).values(rows).on_conflict_do_nothing(
+            index_elements=["recipe_id", "content_hash"]
+        )
+    return insert(RecipePayload).values(rows)
+
+
+def _ids_query(rows: Iterable[dict]):
+    keys = [(row["recipe_id"], row["content_hash"]) for row in rows]
+    return select(RecipePayload.recipe_id, RecipePayload.content_hash, RecipePayload.id).where(
+        tuple_(RecipePayload.recipe_id, RecipePayload.content_hash).in_(keys)
+    )
+
+
+async def store_payload(db: AsyncSession, recipe_id: str, recipe: dict) -> int:
+    """Id of the shared payload for `recipe`, inserting it if it is new (caller commits)."""
+    row = prepare_payload(recipe_id, recipe)
+    payload_id = await db.scalar(select(RecipePayload.id).filter(
+        RecipePayload.recipe_id == recipe_id,
+        RecipePayload.content_hash == row["content_hash"],
+    ))
+    if payload_id is None:
+        await db.execute(_insert_ignoring_duplicates(db.bind.dialect.name, [row]))
+        payload_id = (await db.execute(_ids_query([row]))).one().id
+    payload_cache.set(payload_id, recipe)
+    return payload_id
+
+
+async def load_payloads(db: AsyncSession, payload_ids: Iterable[int]) -> dict[int, dict]:
+    """Decoded payloads by id; only ids missing from the cache are read (one query)."""
+    found, missing = {}, []
+    for payload_id in set(payload_ids):
+        cached = payload_cache.get(payload_id)
+        if cached is None:
+            missing.append(payload_id)
+        else:
+            found[payload_id] = cached
+    if missing:
+        rows = await db.execute(
+            select(RecipePayload.id, RecipePayload.encoding, RecipePayload.data)
+            .where(RecipePayload.id.in_(missing))
+        )
+        for payload_id, encoding, data in rows:
+            recipe = decode_payload(encoding, data)
+            payload_cache.set(payload_id, recipe)
+            found[payload_id] = recipe
+    return found
+
+
+# ======================================================
+# MIGRATION (inline favorites.recipe_json -> recipe_payloads)
+# ======================================================
+
+def upgrade_schema(engine) -> list[str]:
+    """Create recipe_payloads and add favorites.payload_id / relax recipe_json. Returns DDL run."""
+    RecipePayload.__table__.create(bind=engine, checkfirst=True)
+    if not inspect(engine).has_table("favorites"):
+        FavoriteRecipe.__table__.create(bind=engine)
+        return []
+    dialect = engine.dialect.name
+    columns = {c["name"]: c for c in inspect(engine).get_columns("favorites")}
+    if dialect == "sqlite" and not columns["recipe_json"]["nullable"]:
+        statements = _sqlite_rebuild_favorites(engine.dialect, columns)
+    else:
+        statements = _alter_favorites(dialect, columns)
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+    return statements
+
+
+def _alter_favorites(dialect: str, columns: dict) -> list[str]:
+    statements = []
+    if "payload_id" not in columns:
+        statements.append("ALTER TABLE favorites ADD COLUMN payload_id INTEGER NULL")
+        statements.append("CREATE INDEX ix_favorites_payload_id ON favorites (payload_id)")
+        if dialect != "sqlite":
+            statements.append(
+                "ALTER TABLE favorites ADD CONSTRAINT fk_favorites_payload "
+                "FOREIGN KEY (payload_id) REFERENCES recipe_payloads (id)"
+            )
+    if not columns["recipe_json"]["nullable"]:
+        if dialect == "mysql":
+            statements.append("ALTER TABLE favorites MODIFY recipe_json JSON NULL")
+        elif dialect == "postgresql":
+            statements.append("ALTER TABLE favorites ALTER COLUMN recipe_json DROP NOT NULL")
+        else:
+            raise RuntimeError(f"Cannot relax favorites.recipe_json on {dialect}")
+    return statements
+
+
+def _sqlite_rebuild_favorites(dialect, columns: dict) -> list[str]:
+    """SQLite cannot ALTER a column's NOT NULL: create the new table, copy rows, drop, rename."""
+    table = FavoriteRecipe.__table__
+    metadata = MetaData()
+    for fk in table.foreign_keys:  # CREATE TABLE needs the referenced tables to render REFERENCES
+        fk.column.table.to_metadata(metadata)
+    rebuilt = table.to_metadata(metadata, name="favorites_new")
+    copied = ", ".join(c.name for c in table.columns if c.name in columns)
+    return [
+        str(CreateTable(rebuilt).compile(dialect=dialect)).strip(),
+        f"INSERT INTO favorites_new ({copied}) SELECT {copied} FROM favorites",
+        "DROP TABLE favorites",
+        "ALTER TABLE favorites_new RENAME TO favorites",
+        # Index names are database-wide in SQLite, so they are recreated once the old table is gone
+        *(str(CreateIndex(index).compile(dialect=dialect)).strip()
+          for index in sorted(table.indexes, key=lambda index: index.name)),
+    ]
+
+
+def migrate_favorites(db: Session, batch_size: int = 500) -> int:
+    """Move inline recipe_json copies into shared payloads, one transaction per batch."""
+    migrated = 0
+    while True:
+        favorites = db.execute(
+            select(FavoriteRecipe.id, FavoriteRecipe.recipe_id, FavoriteRecipe.recipe_json)
+            .where(FavoriteRecipe.payload_id.is_(None), FavoriteRecipe.recipe_json.isnot(None))
+            .order_by(FavoriteRecipe.id)
+            .limit(batch_size)
+        ).all()
+        if not favorites:
+            return migrated
+
+        prepared = {fav.id: prepare_payload(fav.recipe_id, fav.recipe_json) for fav in favorites}
+        unique_rows = list({(r["recipe_id"], r["content_hash"]): r for r in prepared.values()}.values())
+        db.execute(_insert_ignoring_duplicates(db.bind.dialect.name, unique_rows))
+        ids = {(rid, h): pid for rid, h, pid in db.execute(_ids_query(unique_rows))}
+
+        db.execute(update(FavoriteRecipe), [
+            {
+                "id": fav_id,
+                "payload_id": ids[(row["recipe_id"], row["content_hash"])],
+                "recipe_json": None,
+            }
+            for fav_id, row in prepared.items()
+        ])
+        db.commit()
+        migrated += len(favorites)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.payloads", description="Manage shared recipe payloads")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate_cmd = sub.add_parser("migrate", help="Move favorites.recipe_json copies into recipe_payloads")
+    migrate_cmd.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    from .database import SessionLocal, engine
+
+    for statement in upgrade_schema(engine):
+        print(f"Ran: {statement}")
+    with SessionLocal() as db:
+        migrated = migrate_favorites(db, args.batch_size)
+    print(f"Migrated {migrated} favorite(s) to shared payloads")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
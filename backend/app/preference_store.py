@@ -0,0 +1,70 @@
+"""
+Per-user dietary preference sets.
+
+Reads go through a write-through TTL cache, so the recommendation and search
+paths normally skip the user_preferences query entirely. Saves diff the
+requested set against the stored one and issue at most one DELETE and one
+multi-row INSERT. Other workers see a change within
+PREFERENCE_CACHE_TTL_SECONDS.
+"""
+
+from typing import Iterable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .config import settings
+from .models.user_preference import UserPreference
+
+preference_cache = TTLCache(
+    maxsize=settings.PREFERENCE_CACHE_MAX_ENTRIES,
+    ttl=settings.PREFERENCE_CACHE_TTL_SECONDS,
+)
+
+
+async def _query_preferences(db: AsyncSession, user_id: int) -> tuple[str, ...]:
+    rows = await db.scalars(
+        select(UserPreference.preference_type)
+        .filter(UserPreference.user_id == user_id)
+        .order_by(UserPreference.id)
+    )
+    return tuple(dict.fromkeys(rows))
+
+
+async def get_preferences(db: AsyncSession, user_id: int) -> tuple[str, ...]:
+    """The user's preferences in the order they were added (cached)."""
+    cached = preference_cache.get(user_id)
+    if cached is not None:
+        return cached
+    preferences = await _query_preferences(db, user_id)
+    preference_cache.set(user_id, preferences)
+    return preferences
+
+
+async def replace_preferences(db: AsyncSession, user_id: int, requested: Iterable[str]) -> tuple[str, ...]:
+    """
+    Make the stored set equal to `requested` (blank entries ignored) and commit.
+    Only the differences are written; nothing is written if the set is unchanged.
+    """
+    wanted = tuple(dict.fromkeys(p.strip() for p in requested if p and p.strip()))
+    # Diff against the database, not the cache: another worker may have written since
+    current = await _query_preferences(db, user_id)
+
+    removed = [p for p in current if p not in wanted]
+    added = [p for p in wanted if p not in current]
+    if removed:
+        await db.execute(delete(UserPreference).filter(
+            UserPreference.user_id == user_id,
+            UserPreference.preference_type.in_(removed),
+        ))
+    if added:
+        await db.execute(insert(UserPreference), [
+            {"user_id": user_id, "preference_type": p} for p in added
+        ])
+    if removed or added:
+        await db.commit()
+
+    preferences = tuple(p for p in current if p not in removed) + tuple(added)
+    preference_cache.set(user_id, preferences)
+    return preferences
@@ -0,0 +1,333 @@
+"""
+Token-bucket rate limiting for the expensive public endpoints.
+
+Each rule matches one (method, path) and may limit per client IP and per
+account (the email/username in the request body). A limit "N/S" is a
+bucket of N tokens that refills at N per S seconds; each request takes one.
+When a bucket is empty the request is answered with 429 and Retry-After.
+
+Buckets live in a BucketStore. MemoryBucketStore is per process; set
+RATE_LIMIT_STORAGE_URL=redis://... (requires the optional `redis` package)
+to share buckets between workers through Redis or a Redis-compatible server
+that supports EVAL.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+from urllib.parse import parse_qs
+
+from fastapi.responses import ORJSONResponse
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Request bodies larger than this are not parsed for an account key
+MAX_BODY_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    capacity: int
+    period_seconds: float
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second."""
+        return self.capacity / self.period_seconds
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["RateLimit"]:
+        """'20/60' -> 20 requests per 60 seconds; '' or '0' disables the limit."""
+        value = (value or "").strip()
+        if not value or value == "0":
+            return None
+        count, _, seconds = value.partition("/")
+        return cls(int(count), float(seconds or 60))
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    name: str
+    method: str
+    path: str
+    per_ip: Optional[RateLimit] = None
+    per_account: Optional[RateLimit] = None
+    account_field: Optional[str] = None  # body field (JSON or form) identifying the account
+    # Key the account bucket on (account, client IP): one client cannot use up
+    # another client's quota for an account (e.g. lock a victim out of login)
+    account_per_ip: bool = False
+
+
+class BucketStore(ABC):
+    """Storage for token buckets. take() returns 0 if a token was taken, else seconds to wait."""
+
+    @abstractmethod
+    async def take(self, key: str, limit: RateLimit) -> float:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__}
+
+
+class MemoryBucketStore(BucketStore):
+    """Per-process buckets; least recently used keys are dropped beyond `max_keys`."""
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(limit.capacity), now))
+            tokens = min(float(limit.capacity), tokens + (now - updated) * limit.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "keys": len(self._buckets), "max_keys": self.max_keys}
+
+
+# Refill + take in one atomic step, using the server clock so workers agree
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore(BucketStore):
+    """Buckets shared by all workers, kept in Redis (or a compatible server) as small hashes."""
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self._client = client
+        self._prefix = prefix
+        self._take = client.register_script(_TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBucketStore":
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_STORAGE_URL is set but the `redis` package is not installed") from exc
+        return cls(redis_asyncio.from_url(url))
+
+    async def take(self, key: str, limit: RateLimit) -> float:
+        wait = await self._take(keys=[self._prefix + key], args=[limit.capacity, limit.rate])
+        return float(wait)
+
+    async def clear(self) -> None:
+        async for key in self._client.scan_iter(match=self._prefix + "*"):
+            await self._client.delete(key)
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+def build_store(url: str) -> BucketStore:
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBucketStore.from_url(url)
+    return MemoryBucketStore(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+def default_rules() -> list[RateLimitRule]:
+    login = dict(
+        per_ip=RateLimit.parse(settings.RATE_LIMIT_LOGIN_PER_IP),
+        per_account=RateLimit.parse(settings.RATE_LIMIT_LOGIN_PER_ACCOUNT),
+    )
+    register = dict(
+        per_ip=RateLimit.parse(settings.RATE_LIMIT_REGISTER_PER_IP),
+        per_account=RateLimit.parse(settings.RATE_LIMIT_REGISTER_PER_ACCOUNT),
+    )
+    support = dict(
+        per_ip=RateLimit.parse(settings.RATE_LIMIT_SUPPORT_PER_IP),
+        per_account=RateLimit.parse(settings.RATE_LIMIT_SUPPORT_PER_ACCOUNT),
+    )
+    return [
+        RateLimitRule("login", "POST", "/api/login", account_field="username", account_per_ip=True, **login),
+        RateLimitRule("register", "POST", "/api/register", account_field="email", **register),
+        # Both paths share the "support" buckets
+        RateLimitRule("support", "POST", "/api/support/send_message", account_field="email", **support),
+        RateLimitRule("support", "POST", "/support/send_message", account_field="email", **support),
+    ]
+
+
+class RateLimiter:
+    def __init__(self, store: BucketStore, rules: list[RateLimitRule], enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self._rules = {(rule.method, rule.path): rule for rule in rules}
+        self.allowed = 0
+        self.limited: dict[str, int] = {}
+
+    def match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        if not self.enabled:
+            return None
+        return self._rules.get((method, path.rstrip("/") or "/"))
+
+    async def check(self, rule: RateLimitRule, client_ip: Optional[str], account: Optional[str]) -> float:
+        """
+        Take a token from each applicable bucket, stopping at the first empty one
+        (so a rejected request does not use up the remaining buckets' quota).
+        Returns the seconds to wait, 0 if allowed.
+        """
+        buckets = []
+        if rule.per_ip and client_ip:
+            buckets.append((f"{rule.name}:ip:{client_ip}", rule.per_ip))
+        if rule.per_account and account:
+            account_key = f"{account}|{client_ip}" if rule.account_per_ip else account
+            buckets.append((f"{rule.name}:account:{account_key}", rule.per_account))
+        wait = 0.0
+        for key, limit in buckets:
+            wait = await self.store.take(key, limit)
+            if wait > 0:
+                break
+        if wait > 0:
+            self.limited[rule.name] = self.limited.get(rule.name, 0) + 1
+        else:
+            self.allowed += 1
+        return wait
+
+    async def reset(self) -> None:
+        await self.store.clear()
+        self.allowed = 0
+        self.limited = {}
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "store": self.store.stats(),
+            "allowed": self.allowed,
+            "limited": dict(self.limited),
+        }
+
+
+def _client_ip(scope, trust_forwarded: bool) -> Optional[str]:
+    if trust_forwarded:
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _account_from_body(scope, body: bytes, field: str) -> Optional[str]:
+    content_type = ""
+    for name, value in scope.get("headers", ()):
+        if name == b"content-type":
+            content_type = value.decode("latin-1").lower()
+    try:
+        if "application/json" in content_type:
+            data = json.loads(body or b"{}")
+            value = data.get(field) if isinstance(data, dict) else None
+        elif "application/x-www-form-urlencoded" in content_type:
+            value = (parse_qs(body.decode("utf-8")).get(field) or [None])[0]
+        else:
+            return None
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return value.strip().lower() if isinstance(value, str) and value.strip() else None
+
+
+async def _read_body(receive) -> tuple[bytes, list]:
+    """Read the request body, keeping the messages so they can be replayed downstream."""
+    messages, chunks, size = [], [], 0
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        size += len(chunks[-1])
+        if not message.get("more_body") or size > MAX_BODY_BYTES:
+            break
+    return b"".join(chunks), messages
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware applying a RateLimiter before the request reaches the app."""
+
+    def __init__(self, app, limiter: "RateLimiter", trust_forwarded: bool = False):
+        self.app = app
+        self.limiter = limiter
+        self.trust_forwarded = trust_forwarded
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        rule = self.limiter.match(scope["method"], scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        account = None
+        downstream_receive = receive
+        if rule.per_account and rule.account_field:
+            body, messages = await _read_body(receive)
+            if len(body) <= MAX_BODY_BYTES:
+                account = _account_from_body(scope, body, rule.account_field)
+
+            async def downstream_receive():
+                return messages.pop(0) if messages else await receive()
+
+        try:
+            wait = await self.limiter.check(rule, _client_ip(scope, self.trust_forwarded), account)
+        except Exception:
+            # A broken shared store must not take the endpoints down with it
+            logger.exception("Rate limit check failed; allowing request")
+            wait = 0.0
+
+        if wait > 0:
+            retry_after = max(1, math.ceil(wait))
+            response = ORJSONResponse(
+                {"detail": f"Too many requests, try again in {retry_after} seconds"},
+                status_code=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+            return await response(scope, downstream_receive, send)
+        return await self.app(scope, downstream_receive, send)
+
+
+rate_limiter = RateLimiter(
+    build_store(settings.RATE_LIMIT_STORAGE_URL),
+    default_rules(),
+    enabled=settings.RATE_LIMIT_ENABLED,
+)
@@ -1,23 +1,22 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from ..database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+from ..database import get_async_db
 from ..models.user import User
 from ..schemas.auth import UserRegister, Token
-from ..security import get_password_hash, verify_password, create_access_token
+from ..security import get_password_hash_async, verify_password_async, create_access_token
 from ..config import settings
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from ..write_behind import last_login_buffer
 
 router = APIRouter(prefix="/api", tags=["auth"])
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).filter(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,7 +24,7 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -33,30 +32,28 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
     
     return {"message": "User registered successfully", "email": new_user.email}
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """Login and get access token"""
     # Find user by email (form_data.username contains the email)
     # Check both username and email fields
-    user = db.query(User).filter(
+    user = await db.scalar(select(User).filter(
         or_(User.username == form_data.username, User.email == form_data.username)
-    ).first()
+    ).limit(1))
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
+    # Update last login (buffered; flushed in batches off the request path)
+    last_login_buffer.record(user.id)
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -70,36 +67,3 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         "token_type": "bearer",
         "username": user.email.split("@")[0]
     }
-
-
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
-
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    """Retrieve the currently authenticated user based on JWT token."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
-        raise credentials_exception
-
-    return user
@@ -1,58 +1,195 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
-from ..models.user import User
+from typing import AsyncIterator, Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
 from ..models.favorite import FavoriteRecipe
+from ..models.recipe_payload import RecipePayload
+from ..payloads import decode_payload, load_payloads, payload_cache, store_payload
 from ..schemas.favorites import FavoriteCreate, FavoriteResponse
-from ..security import get_current_user
+from ..security import CurrentUser, get_current_user
+from ..versioning import FAVORITES, MAX_PAGE_SIZE, bump_version, get_version, make_etag, not_modified
 
 router = APIRouter(prefix="/api/favorites", tags=["favorites"])
 
+# Fields selectable with ?fields=; the default matches FavoriteResponse
+FAVORITE_FIELDS = ("id", "recipe_id", "created_at", "name", "thumbnail", "recipe_json")
+DEFAULT_FIELDS = ("id", "recipe_id", "recipe_json", "created_at")
+# Rows fetched per round-trip (and emitted per chunk) when streaming
+STREAM_CHUNK_ROWS = 200
+
+
+def _to_item(favorite: FavoriteRecipe, recipe_json: Optional[dict]) -> dict:
+    """FavoriteResponse-shaped dict (built from trusted DB values, so not re-validated)."""
+    return {
+        "id": favorite.id,
+        "recipe_id": favorite.recipe_id,
+        "recipe_json": recipe_json if recipe_json is not None else favorite.recipe_json,
+        "created_at": favorite.created_at,
+    }
+
+
+def _parse_fields(fields: Optional[str]) -> tuple[str, ...]:
+    if not fields:
+        return DEFAULT_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - set(FAVORITE_FIELDS))
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}; choose from {', '.join(FAVORITE_FIELDS)}"
+        )
+    return tuple(dict.fromkeys(requested))
+
+
+def _projected_query(user_id: int, selected: tuple[str, ...], after_id: Optional[int], limit: Optional[int]):
+    """SELECT of only the columns `selected` needs; payload blobs are joined only for recipe_json."""
+    legacy = FavoriteRecipe.recipe_json
+    columns = [FavoriteRecipe.id]
+    if "recipe_id" in selected:
+        columns.append(FavoriteRecipe.recipe_id)
+    if "created_at" in selected:
+        columns.append(FavoriteRecipe.created_at)
+    if "name" in selected:
+        # Legacy inline rows have no payload: read the name out of their JSON in SQL
+        columns.append(func.coalesce(
+            RecipePayload.name, legacy["name"].as_string(), legacy["strMeal"].as_string()
+        ).label("name"))
+    if "thumbnail" in selected:
+        columns.append(func.coalesce(
+            RecipePayload.thumbnail, legacy["thumbnail"].as_string(), legacy["strMealThumb"].as_string()
+        ).label("thumbnail"))
+    if "recipe_json" in selected:
+        columns += [FavoriteRecipe.payload_id, legacy, RecipePayload.encoding, RecipePayload.data]
+
+    query = (
+        select(*columns)
+        .outerjoin(RecipePayload, FavoriteRecipe.payload_id == RecipePayload.id)
+        .filter(FavoriteRecipe.user_id == user_id)
+        .order_by(FavoriteRecipe.id)
+    )
+    if after_id is not None:
+        query = query.filter(FavoriteRecipe.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def _row_to_item(row, selected: tuple[str, ...]) -> dict:
+    item = {}
+    for field in selected:
+        if field == "recipe_json":
+            if row.payload_id is None:
+                item[field] = row.recipe_json
+            else:
+                item[field] = payload_cache.get(row.payload_id)
+                if item[field] is None:
+                    item[field] = decode_payload(row.encoding, row.data)
+                    payload_cache.set(row.payload_id, item[field])
+        else:
+            item[field] = getattr(row, field)
+    return item
+
+
+async def _stream_favorites(db: AsyncSession, query, selected: tuple[str, ...]) -> AsyncIterator[bytes]:
+    """
+    Emit a JSON array chunk by chunk, STREAM_CHUNK_ROWS rows per fetch.
+
+    Reads through the request's own session: get_async_db is torn down only
+    after the response has been sent, so the body is produced on the same
+    connection and in the same transaction as the version behind the ETag.
+    """
+    yield b"["
+    first = True
+    result = await db.stream(query.execution_options(yield_per=STREAM_CHUNK_ROWS))
+    async for rows in result.partitions():
+        body = b",".join(orjson.dumps(_row_to_item(row, selected)) for row in rows)
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
+
+
 @router.post("/{recipe_id}", response_model=FavoriteResponse, status_code=status.HTTP_201_CREATED)
-def add_favorite(
+async def add_favorite(
     recipe_id: str,
     payload: FavoriteCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    existing = db.query(FavoriteRecipe).filter(
+    existing = await db.scalar(select(FavoriteRecipe).filter(
         FavoriteRecipe.user_id == current_user.id,
         FavoriteRecipe.recipe_id == recipe_id
-    ).first()
+    ))
     if existing:
-        return FavoriteResponse.from_orm(existing)
+        payloads = await load_payloads(db, [existing.payload_id] if existing.payload_id else [])
+        return ORJSONResponse(
+            _to_item(existing, payloads.get(existing.payload_id)), status_code=status.HTTP_201_CREATED
+        )
 
     favorite = FavoriteRecipe(
         user_id=current_user.id,
         recipe_id=recipe_id,
-        recipe_json=payload.recipe_json
+        payload_id=await store_payload(db, recipe_id, payload.recipe_json)
     )
     db.add(favorite)
-    db.commit()
-    db.refresh(favorite)
-    return FavoriteResponse.from_orm(favorite)
+    await bump_version(db, current_user.id, FAVORITES)
+    await db.commit()
+    await db.refresh(favorite)
+    return ORJSONResponse(_to_item(favorite, payload.recipe_json), status_code=status.HTTP_201_CREATED)
 
 @router.delete("/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_favorite(
+async def remove_favorite(
     recipe_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    favorite = db.query(FavoriteRecipe).filter(
+    favorite = await db.scalar(select(FavoriteRecipe).filter(
         FavoriteRecipe.user_id == current_user.id,
         FavoriteRecipe.recipe_id == recipe_id
-    ).first()
+    ))
     if not favorite:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Favorite not found")
-    db.delete(favorite)
-    db.commit()
+    await db.delete(favorite)
+    await bump_version(db, current_user.id, FAVORITES)
+    await db.commit()
     return None
 
-@router.get("/", response_model=List[FavoriteResponse])
-def list_favorites(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/")
+async def list_favorites(
+    request: Request,
+    after_id: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of: " + ", ".join(FAVORITE_FIELDS)),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    favorites = db.query(FavoriteRecipe).filter(FavoriteRecipe.user_id == current_user.id).all()
-    return [FavoriteResponse.from_orm(f) for f in favorites]
\ No newline at end of file
+    """
+    Favorites ordered by id, with optional keyset paging (?limit=N&after_id=...)
+    and ETag / If-None-Match revalidation (304 without reading the rows).
+
+    ?fields= selects only those columns in SQL (e.g. fields=id,name,thumbnail
+    never reads the recipe payloads). Without ?limit the listing is streamed
+    as chunked JSON, so memory stays flat however many favorites there are.
+    """
+    selected = _parse_fields(fields)
+    version = await get_version(db, current_user.id, FAVORITES)
+    etag = make_etag(FAVORITES, current_user.id, version, after_id, limit, ".".join(selected))
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    query = _projected_query(current_user.id, selected, after_id, limit)
+    if limit is None:
+        return StreamingResponse(
+            _stream_favorites(db, query, selected),
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
+
+    rows = (await db.execute(query)).all()
+    headers = {"ETag": etag}
+    if len(rows) == limit:
+        headers["X-Next-After-Id"] = str(rows[-1].id)
+    return ORJSONResponse([_row_to_item(row, selected) for row in rows], headers=headers)
@@ -1,70 +1,214 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
 from datetime import datetime
-from app.database import get_db
-from app.models import UserIngredient, GroceryList, GroceryListItem, User
-from app.routers.auth import get_current_user
+from app.catalog import RecipeCatalog, get_recipe_catalog, normalize_ingredient, parse_meal
+from app.config import settings
+from app.database import get_async_db
+from app.models import UserIngredient, GroceryList, GroceryListItem
+from app.schemas.grocery_list import GroceryListResponse, GroceryListSave
+from app.security import CurrentUser, get_current_user
+from app.serialization import orm_response
+from app.upstream import MealDBClient, UpstreamError, get_mealdb
 
 router = APIRouter(prefix="/api/grocery-list", tags=["Grocery List"])
 
+MAX_LISTS_PER_PAGE = 100
+
+
+def _encode_cursor(grocery_list: GroceryList) -> str:
+    # Rows saved outside the ORM may lack created_at: "_<id>"
+    created_at = grocery_list.created_at.isoformat() if grocery_list.created_at else ""
+    return f"{created_at}_{grocery_list.id}"
+
+
+def _decode_cursor(cursor: str) -> tuple[Optional[datetime], int]:
+    try:
+        created_at, list_id = cursor.rsplit("_", 1)
+        return (datetime.fromisoformat(created_at) if created_at else None), int(list_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# Explicit "IS NULL" term: Postgres sorts NULLs first in DESC order, MySQL/SQLite last
+NEWEST_FIRST = (GroceryList.created_at.is_(None), GroceryList.created_at.desc(), GroceryList.id.desc())
+
+
+def _after_cursor(created_at: Optional[datetime], list_id: int):
+    """
+    Rows after the cursor in NEWEST_FIRST order: undated lists come after all
+    dated ones, each group newest (highest id) first.
+    """
+    if created_at is None:
+        return and_(GroceryList.created_at.is_(None), GroceryList.id < list_id)
+    return or_(
+        GroceryList.created_at < created_at,
+        and_(GroceryList.created_at == created_at, GroceryList.id < list_id),
+        GroceryList.created_at.is_(None),
+    )
+
+
+async def _lookup_ingredients(
+    mealdb: MealDBClient, semaphore: asyncio.Semaphore, recipe_id: int
+) -> Optional[tuple[str, ...]]:
+    """
+    Normalized ingredients of a recipe missing from the local catalog, from
+    TheMealDB's lookup.php (cached by the shared client); None if TheMealDB
+    does not know the id either.
+    """
+    async with semaphore:
+        data = await mealdb.get_json("lookup.php", {"i": str(recipe_id)})
+    meals = data.get("meals") or []
+    if not meals:
+        return None
+    return tuple(i.normalized_name for i in parse_meal(meals[0]).ingredients)
+
 
 # --- USER STORY 5.2: Generate Grocery List ---
 @router.post("/generate")
-def generate_grocery_list(
+async def generate_grocery_list(
     recipe_ids: list[int],
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    mealdb: MealDBClient = Depends(get_mealdb),
+    catalog: RecipeCatalog = Depends(get_recipe_catalog),
 ):
     """
     Generate grocery list for selected recipes.
     Lists only missing ingredients (no quantities).
+    Recipe ingredients come from the local catalog (see app.catalog); recipes
+    it does not have (e.g. the catalog was never ingested) are looked up on
+    TheMealDB instead.
     """
-    # Temporary test data until RecipeIngredient model exists
-    recipe_ingredients = {"tomato", "onion", "garlic", "pasta"}
+    # Step 1: Collect the recipes' ingredients from the in-memory catalog
+    recipe_ingredients = set()
+    missing_ids = []
+    for recipe_id in dict.fromkeys(recipe_ids):
+        if recipe_id in catalog:
+            recipe_ingredients.update(catalog.ingredients_of(recipe_id))
+        else:
+            missing_ids.append(recipe_id)
+
+    unknown_recipe_ids = []
+    if missing_ids:
+        semaphore = asyncio.Semaphore(settings.RECIPE_SEARCH_CONCURRENCY)
+        try:
+            looked_up = await asyncio.gather(*(_lookup_ingredients(mealdb, semaphore, rid) for rid in missing_ids))
+        except UpstreamError as exc:
+            # A partial list would look complete, so fail the whole request
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail=f"Failed to fetch recipes from TheMealDB: {exc}",
+            )
+        for recipe_id, ingredients in zip(missing_ids, looked_up):
+            if ingredients is None:
+                unknown_recipe_ids.append(recipe_id)
+            else:
+                recipe_ingredients.update(ingredients)
 
 
     # Step 2: Get user’s pantry ingredients
-    pantry_items = db.query(UserIngredient).filter(
+    pantry_items = (await db.scalars(select(UserIngredient.ingredient_name).filter(
         UserIngredient.user_id == current_user.id
-    ).all()
-    pantry_names = {p.ingredient_name.lower() for p in pantry_items}
+    ))).all()
+    pantry_names = {normalize_ingredient(name) for name in pantry_items}
 
 
     # Step 3: Determine missing ingredients
     missing_ingredients = sorted(list(recipe_ingredients - pantry_names))
 
-    return {"grocery_list": missing_ingredients}
+    return {"grocery_list": missing_ingredients, "unknown_recipe_ids": unknown_recipe_ids}
 
 
 # --- USER STORY 5.3: Save Grocery List ---
 @router.post("/save")
-def save_grocery_list(
-    data: dict,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def save_grocery_list(
+    payload: GroceryListSave,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Save generated grocery list to database.
+    One transaction: INSERT the list, one executemany INSERT for its items, COMMIT.
     """
-    items = data.get("grocery_list", [])
+    # Drop blanks and duplicates while keeping order
+    items = list(dict.fromkeys(name for name in payload.grocery_list if name))
+    # GroceryListSave caps the list at GROCERY_LIST_MAX_ITEMS
     if not items:
         raise HTTPException(status_code=400, detail="No items to save")
 
-    new_list = GroceryList(
-        user_id=current_user.id,
-        name=f"Grocery List {datetime.now():%Y-%m-%d %H:%M}",
-        created_at=datetime.now()
-    )
-    db.add(new_list)
-    db.commit()
-    db.refresh(new_list)
-
-    for name in items:
-        entry = GroceryListItem(
-            grocery_list_id=new_list.id,
-            ingredient_name=name
+    now = datetime.now()
+    try:
+        new_list = GroceryList(
+            user_id=current_user.id,
+            name=payload.name or f"Grocery List {now:%Y-%m-%d %H:%M}",
+            created_at=now
+        )
+        db.add(new_list)
+        await db.flush()  # assigns new_list.id without committing
+
+        await db.execute(
+            insert(GroceryListItem),
+            [{"grocery_list_id": new_list.id, "ingredient_name": name} for name in items],
+        )
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error saving grocery list: {str(e)}"
         )
-        db.add(entry)
-    db.commit()
 
-    return {"message": "Grocery list saved", "list_id": new_list.id}
+    return {"message": "Grocery list saved", "list_id": new_list.id, "item_count": len(items)}
+
+
+
+# --- Read saved grocery lists ---
+@router.get("/", response_model=List[GroceryListResponse])
+async def list_grocery_lists(
+    limit: int = Query(20, ge=1, le=MAX_LISTS_PER_PAGE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Saved grocery lists with their items, newest first.
+    Two queries per page (lists, then all their items via selectinload).
+    Keyset paging on (created_at, id): pass X-Next-Cursor back as ?cursor=.
+    """
+    query = (
+        select(GroceryList)
+        .options(selectinload(GroceryList.items))
+        .filter(GroceryList.user_id == current_user.id)
+        .order_by(*NEWEST_FIRST)
+        .limit(limit)
+    )
+    if cursor:
+        query = query.filter(_after_cursor(*_decode_cursor(cursor)))
+    lists = (await db.scalars(query)).all()
+
+    headers = {}
+    if len(lists) == limit:
+        headers["X-Next-Cursor"] = _encode_cursor(lists[-1])
+    return orm_response(GroceryListResponse, lists, headers=headers)
+
+
+@router.get("/{list_id}", response_model=GroceryListResponse)
+async def get_grocery_list(
+    list_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """One saved grocery list with its items."""
+    grocery_list = await db.scalar(
+        select(GroceryList)
+        .options(selectinload(GroceryList.items))
+        .filter(GroceryList.id == list_id, GroceryList.user_id == current_user.id)
+    )
+    if not grocery_list:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Grocery list not found")
+    return orm_response(GroceryListResponse, grocery_list)
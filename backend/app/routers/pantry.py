@@ -1,31 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List
-from ..database import get_db
-from ..models.user import User
+from typing import List, Optional
+from ..database import get_async_db
 from ..models.ingredient import UserIngredient
-from ..schemas.pantry import IngredientCreate, IngredientResponse
-from ..security import get_current_user
+from ..schemas.pantry import IngredientBulkCreate, IngredientBulkDelete, IngredientCreate, IngredientResponse
+from ..security import CurrentUser, get_current_user
+from ..serialization import orm_response
+from ..versioning import MAX_PAGE_SIZE, PANTRY, bump_version, get_version, make_etag, not_modified
 
 router = APIRouter(prefix="/api/pantry", tags=["pantry"])
 
+
+def _insert_ignoring_duplicates(dialect_name: str, rows: list[dict]):
+    """Multi-row INSERT that skips rows hitting the (user_id, ingredient_name) unique key."""
+    if dialect_name == "mysql":
+        stmt = mysql_insert(UserIngredient).values(rows)
+        # no-op update: the MySQL idiom for "insert, ignore duplicate keys" without INSERT IGNORE's side effects
+        return stmt.on_duplicate_key_update(ingredient_name=stmt.inserted.ingredient_name)
+    if dialect_name == "sqlite":
+        return sqlite_insert(UserIngredient).values(rows).on_conflict_do_nothing(
+            index_elements=["user_id", "ingredient_name"]
+        )
+    if dialect_name == "postgresql":
+        return postgresql_insert(UserIngredient).values(rows).on_conflict_do_nothing(
+            index_elements=["user_id", "ingredient_name"]
+        )
+    return insert(UserIngredient).values(rows)
+
+
+def _check_bulk_size(count: int) -> None:
+    # The upper bound (PANTRY_BULK_MAX_ITEMS) is enforced by the request schemas
+    if count == 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No ingredients provided")
+
 @router.post("/", response_model=IngredientResponse, status_code=status.HTTP_201_CREATED)
-def add_ingredient(
+async def add_ingredient(
     ingredient: IngredientCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add an ingredient to user's pantry"""
     try:
         # Check if ingredient already exists for this user
-        existing = db.query(UserIngredient).filter(
+        existing = await db.scalar(select(UserIngredient).filter(
             UserIngredient.user_id == current_user.id,
             UserIngredient.ingredient_name == ingredient.ingredient_name
-        ).first()
+        ))
 
         if existing:
-            return IngredientResponse.from_orm(existing)
+            return orm_response(IngredientResponse, existing, status_code=status.HTTP_201_CREATED)
 
         # Create new ingredient
         new_ingredient = UserIngredient(
@@ -34,47 +62,152 @@ def add_ingredient(
         )
 
         db.add(new_ingredient)
-        db.commit()
-        db.refresh(new_ingredient)
+        await bump_version(db, current_user.id, PANTRY)
+        await db.commit()
+        await db.refresh(new_ingredient)
 
-        return IngredientResponse.from_orm(new_ingredient)
+        return orm_response(IngredientResponse, new_ingredient, status_code=status.HTTP_201_CREATED)
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error adding ingredient: {str(e)}"
         )
 
 @router.get("/", response_model=List[IngredientResponse])
-def get_ingredients(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_ingredients(
+    request: Request,
+    after_id: Optional[int] = Query(None, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all ingredients from user's pantry"""
+    """
+    Get ingredients from user's pantry, ordered by id.
+    Optional keyset paging: ?limit=N, then ?after_id=<X-Next-After-Id>.
+    Sends an ETag; a matching If-None-Match gets 304 without reading the rows.
+    """
     try:
-        ingredients = db.query(UserIngredient).filter(
-            UserIngredient.user_id == current_user.id
-        ).all()
+        # Read the version before the rows: a concurrent write can only make the ETag older
+        version = await get_version(db, current_user.id, PANTRY)
+        etag = make_etag(PANTRY, current_user.id, version, after_id, limit)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
 
-        return [IngredientResponse.from_orm(i) for i in ingredients]
+        query = (
+            select(UserIngredient)
+            .filter(UserIngredient.user_id == current_user.id)
+            .order_by(UserIngredient.id)
+        )
+        if after_id is not None:
+            query = query.filter(UserIngredient.id > after_id)
+        if limit is not None:
+            query = query.limit(limit)
+        ingredients = (await db.scalars(query)).all()
+
+        headers = {"ETag": etag}
+        if limit is not None and len(ingredients) == limit:
+            headers["X-Next-After-Id"] = str(ingredients[-1].id)
+        return orm_response(IngredientResponse, ingredients, headers=headers)
     except SQLAlchemyError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error getting pantry: {str(e)}"
         )
 
+@router.post("/bulk", response_model=List[IngredientResponse])
+async def add_ingredients_bulk(
+    payload: IngredientBulkCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Add many ingredients in one transaction.
+    One multi-row INSERT that skips existing ones, then one SELECT.
+    Returns the rows for all requested names (new and already present).
+    """
+    # Strip, drop blanks and de-duplicate while keeping order
+    names = list(dict.fromkeys(n.strip() for n in payload.ingredient_names if n.strip()))
+    _check_bulk_size(len(names))
+
+    try:
+        result = await db.execute(_insert_ignoring_duplicates(
+            db.bind.dialect.name,
+            [{"user_id": current_user.id, "ingredient_name": name} for name in names],
+        ))
+        if result.rowcount != 0:  # -1 (unknown) counts as a change
+            await bump_version(db, current_user.id, PANTRY)
+        ingredients = (await db.scalars(
+            select(UserIngredient)
+            .filter(
+                UserIngredient.user_id == current_user.id,
+                UserIngredient.ingredient_name.in_(names)
+            )
+            .order_by(UserIngredient.id)
+        )).all()
+        await db.commit()
+
+        return orm_response(IngredientResponse, ingredients)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error adding ingredients: {str(e)}"
+        )
+
+@router.delete("/bulk", response_model=List[IngredientResponse])
+async def delete_ingredients_bulk(
+    payload: IngredientBulkDelete,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Delete many ingredients in one transaction (one DELETE ... IN).
+    Ids that do not belong to the user are ignored.
+    Returns the user's remaining pantry.
+    """
+    ids = list(dict.fromkeys(payload.ingredient_ids))
+    _check_bulk_size(len(ids))
+
+    try:
+        result = await db.execute(
+            delete(UserIngredient)
+            .where(
+                UserIngredient.user_id == current_user.id,
+                UserIngredient.id.in_(ids)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 0:
+            await bump_version(db, current_user.id, PANTRY)
+        remaining = (await db.scalars(
+            select(UserIngredient)
+            .filter(UserIngredient.user_id == current_user.id)
+            .order_by(UserIngredient.id)
+        )).all()
+        await db.commit()
+
+        return orm_response(IngredientResponse, remaining)
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error deleting ingredients: {str(e)}"
+        )
+
 @router.delete("/{ingredient_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_ingredient(
+async def delete_ingredient(
     ingredient_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an ingredient from user's pantry"""
     try:
-        ingredient = db.query(UserIngredient).filter(
+        ingredient = await db.scalar(select(UserIngredient).filter(
             UserIngredient.id == ingredient_id,
             UserIngredient.user_id == current_user.id
-        ).first()
+        ))
 
         if not ingredient:
             raise HTTPException(
@@ -82,12 +215,13 @@ def delete_ingredient(
                 detail="Ingredient not found"
             )
 
-        db.delete(ingredient)
-        db.commit()
+        await db.delete(ingredient)
+        await bump_version(db, current_user.id, PANTRY)
+        await db.commit()
 
         return None
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error deleting ingredient: {str(e)}"
@@ -1,13 +1,13 @@
 # backend/app/routers/preferences.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
-from ..models.user import User
-from ..models.user_preference import UserPreference
+from ..database import get_async_db
+from ..preference_store import get_preferences, replace_preferences
 from ..schemas.preferences import PreferencesUpdate, PreferencesResponse
-from .auth import get_current_user  # <-- uses your existing auth dependency
+from ..security import CurrentUser, get_current_user
 
 router = APIRouter(
     prefix="/api/preferences",
@@ -16,57 +16,40 @@ router = APIRouter(
 
 
 @router.get("/me", response_model=PreferencesResponse)
-def get_my_preferences(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_my_preferences(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     GET /api/preferences/me
     Return dietary preferences for the currently authenticated user.
     """
-    prefs = (
-        db.query(UserPreference)
-        .filter(UserPreference.user_id == current_user.id)
-        .all()
-    )
+    prefs = await get_preferences(db, current_user.id)
 
-    preference_values = [p.preference_type for p in prefs]
-    return PreferencesResponse(preferences=preference_values)
+    # Already plain strings: render directly instead of validating a model
+    return ORJSONResponse({"preferences": list(prefs)})
 
 
 @router.post("/", response_model=PreferencesResponse)
-def save_my_preferences(
+async def save_my_preferences(
     prefs: PreferencesUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     POST /api/preferences
     Body: { "preferences": ["vegetarian", "vegan", ...] }
 
     Replaces all existing preferences for the current user with the provided list.
+    Only the differences are written (one DELETE and one INSERT at most).
     """
-    # Ensure user exists (current_user is already a User from get_current_user)
+    # Ensure user exists (current_user is the cached principal from get_current_user)
     if current_user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
         )
 
-    # Clear existing preferences for this user
-    db.query(UserPreference).filter(UserPreference.user_id == current_user.id).delete()
-
-    # Insert new preferences
-    for pref in prefs.preferences:
-        pref_value = pref.strip()
-        if not pref_value:
-            continue
-        db_pref = UserPreference(
-            user_id=current_user.id,
-            preference_type=pref_value,
-        )
-        db.add(db_pref)
-
-    db.commit()
+    await replace_preferences(db, current_user.id, prefs.preferences)
 
     return PreferencesResponse(preferences=prefs.preferences)
@@ -1,21 +1,26 @@
 # backend/app/routers/recipes.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-import httpx  # pip install httpx
-
-from ..database import get_db
-from ..models.user import User
-from ..models.user_preference import UserPreference
-from .auth import get_current_user
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..catalog import RecipeCatalog, get_recipe_catalog
+from ..config import settings
+from ..database import get_async_db
+from ..dietary import compile_filter
+from ..models.ingredient import UserIngredient
+from ..preference_store import get_preferences
+from ..security import CurrentUser, get_current_user
+from ..upstream import MealDBClient, UpstreamError, get_mealdb
 
 router = APIRouter(
     prefix="/api/recipes",
     tags=["recipes"],
 )
 
-THEMEALDB_BASE_URL = "https://www.themealdb.com/api/json/v1/1"
-
 PREFERENCE_TO_CATEGORY = {
     "vegan": "Vegan",
     "vegetarian": "Vegetarian",
@@ -40,8 +45,10 @@ def pick_category_from_preferences(prefs: set[str]) -> str | None:
 
 @router.get("/recommendations")
 async def get_recommended_recipes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    mealdb: MealDBClient = Depends(get_mealdb),
+    catalog: RecipeCatalog = Depends(get_recipe_catalog),
 ):
     """
     Get recipe recommendations from TheMealDB, filtered by the user's dietary preferences.
@@ -49,13 +56,8 @@ async def get_recommended_recipes(
         /filter.php?c=<category>
     where <category> might be Vegan, Vegetarian, etc.
     """
-    # 1. Load user preferences from DB
-    user_prefs = (
-        db.query(UserPreference)
-        .filter(UserPreference.user_id == current_user.id)
-        .all()
-    )
-    pref_values = {p.preference_type for p in user_prefs}  # e.g., {"vegan", "nut_free"}
+    # 1. Load user preferences (cached per user)
+    pref_values = set(await get_preferences(db, current_user.id))  # e.g., {"vegan", "nut_free"}
 
     # 2. Decide which category to use for TheMealDB
     category = pick_category_from_preferences(pref_values)
@@ -67,24 +69,113 @@ async def get_recommended_recipes(
         # Here we'll just fall back to "Seafood" as an example.
         category = "Seafood"
 
-    # 3. Call TheMealDB filter endpoint
-    url = f"{THEMEALDB_BASE_URL}/filter.php"
-    params = {"c": category}
-
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params)
-        if resp.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_502_BAD_GATEWAY,
-                detail=f"Failed to fetch recipes from TheMealDB (status {resp.status_code})",
-            )
-
-        data = resp.json()
+    # 3. Call TheMealDB filter endpoint (shared client, cached per category)
+    try:
+        data = await mealdb.get_json("filter.php", {"c": category})
+    except UpstreamError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to fetch recipes from TheMealDB: {exc}",
+        )
 
     # TheMealDB returns something like { "meals": [ { "idMeal": "...", "strMeal": "...", "strMealThumb": "..." }, ... ] }
-    # You can return it as-is or wrap it:
+    # 4. Drop anything that violates the user's other preferences (e.g. nut_free)
+    meals = data.get("meals") or []
+    allowed = compile_filter(pref_values).filter_meals(meals, catalog)
+
     return {
         "category": category,
         "preferences_used": list(pref_values),
-        "meals": data.get("meals", []),
+        "excluded": len(meals) - len(allowed),
+        "meals": allowed,
+    }
+
+
+async def _fetch_meals_for_ingredient(
+    mealdb: MealDBClient, semaphore: asyncio.Semaphore, ingredient: str
+) -> Optional[list]:
+    """
+    TheMealDB /filter.php?i=<ingredient> results, or None if the call failed.
+    The semaphore bounds how many upstream requests are in flight at once.
+    """
+    params = {"i": ingredient.lower().replace(" ", "_")}
+    async with semaphore:
+        try:
+            data = await mealdb.get_json("filter.php", params)
+        except UpstreamError:
+            return None
+    return data.get("meals") or []
+
+
+@router.get("/search")
+async def search_recipes_by_pantry(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    mealdb: MealDBClient = Depends(get_mealdb),
+    catalog: RecipeCatalog = Depends(get_recipe_catalog),
+):
+    """
+    Search TheMealDB for recipes using the ingredients in the user's pantry.
+
+    One filter.php?i=<ingredient> call per pantry ingredient, issued concurrently
+    (at most RECIPE_SEARCH_CONCURRENCY at a time). Results are merged, deduped
+    by idMeal, filtered by the user's dietary preferences and ranked by how
+    many pantry ingredients each recipe matched.
+
+    Not called by the frontend yet: frontend/api.js still fans out to
+    TheMealDB itself, and switching it over is left to a separate frontend
+    change.
+    """
+    names = await db.scalars(
+        select(UserIngredient.ingredient_name)
+        .filter(UserIngredient.user_id == current_user.id)
+    )
+    # Case-insensitive dedupe, keeping the user's spelling for display
+    ingredients = list({name.strip().lower(): name.strip() for name in names if name.strip()}.values())
+
+    if not ingredients:
+        return {"ingredients": [], "total": 0, "page": page, "page_size": page_size, "meals": []}
+
+    semaphore = asyncio.Semaphore(settings.RECIPE_SEARCH_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_fetch_meals_for_ingredient(mealdb, semaphore, name) for name in ingredients)
+    )
+
+    if all(meals is None for meals in results):
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to fetch recipes from TheMealDB",
+        )
+
+    # Merge: idMeal -> meal plus the pantry ingredients it matched
+    merged: dict[str, dict] = {}
+    for ingredient, meals in zip(ingredients, results):
+        for meal in meals or []:
+            meal_id = meal.get("idMeal")
+            if not meal_id:
+                continue  # malformed upstream item; can't be merged or linked to
+            entry = merged.setdefault(meal_id, {**meal, "matchedIngredients": []})
+            entry["matchedIngredients"].append(ingredient)
+
+    user_prefs = await get_preferences(db, current_user.id)
+    allowed = compile_filter(user_prefs).filter_meals(merged.values(), catalog)
+
+    ranked = sorted(
+        allowed,
+        key=lambda m: (-len(m["matchedIngredients"]), m.get("strMeal") or ""),
+    )
+    for meal in ranked:
+        meal["matchCount"] = len(meal["matchedIngredients"])
+        # Same shape the frontend used to build client-side
+        meal["matchedIngredient"] = ", ".join(meal["matchedIngredients"])
+
+    start = (page - 1) * page_size
+    return {
+        "ingredients": ingredients,
+        "total": len(ranked),
+        "page": page,
+        "page_size": page_size,
+        "meals": ranked[start:start + page_size],
     }
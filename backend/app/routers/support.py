@@ -1,16 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from ..database import get_db
-from ..models.support_message import SupportMessage
+from fastapi import APIRouter, HTTPException, status
 from ..schemas.support import SupportMessageCreate
+from ..write_behind import support_queue
 
 
 router = APIRouter(prefix="/api/support", tags=["support"])
 alias_router = APIRouter(prefix="/support", tags=["support"])
 
 
-def _handle_send_message(payload: SupportMessageCreate, db: Session):
-    """Core handler to validate and store support messages."""
+def _handle_send_message(payload: SupportMessageCreate):
+    """Core handler to validate and queue support messages (written in batches by write_behind)."""
     # Additional server-side constraints
     if len(payload.name.strip()) == 0 or len(payload.message.strip()) == 0:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Fields cannot be empty")
@@ -20,29 +18,27 @@ def _handle_send_message(payload: SupportMessageCreate, db: Session):
     if len(str(payload.email)) > 120:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email too long")
 
-    try:
-        msg = SupportMessage(
-            name=payload.name.strip(),
-            email=str(payload.email).strip(),
-            message=payload.message.strip(),
+    accepted = support_queue.offer(
+        name=payload.name.strip(),
+        email=str(payload.email).strip(),
+        message=payload.message.strip(),
+    )
+    if not accepted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many support messages right now, please try again shortly",
+            headers={"Retry-After": "5"},
         )
-        db.add(msg)
-        db.commit()
-        db.refresh(msg)
+    return {"message": "Message sent successfully!"}
 
-        return {"message": "Message sent successfully!"}
-    except Exception as exc:
-        db.rollback()
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Failed to store message: {exc}")
 
+@router.post("/send_message", status_code=status.HTTP_202_ACCEPTED)
+async def send_message(payload: SupportMessageCreate):
+    """Receive feedback/issue report and queue it for storage."""
+    return _handle_send_message(payload)
 
-@router.post("/send_message")
-def send_message(payload: SupportMessageCreate, db: Session = Depends(get_db)):
-    """Receive feedback/issue report and store it in DB."""
-    return _handle_send_message(payload, db)
 
-
-@alias_router.post("/send_message")
-def send_message_alias(payload: SupportMessageCreate, db: Session = Depends(get_db)):
+@alias_router.post("/send_message", status_code=status.HTTP_202_ACCEPTED)
+async def send_message_alias(payload: SupportMessageCreate):
     """Alias endpoint without /api prefix to match acceptance criteria."""
-    return _handle_send_message(payload, db)
\ No newline at end of file
+    return _handle_send_message(payload)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from typing import Any, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 
 class FavoriteCreate(BaseModel):
@@ -11,5 +11,4 @@ class FavoriteResponse(BaseModel):
     recipe_json: Dict[str, Any]
     created_at: datetime | None = None
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
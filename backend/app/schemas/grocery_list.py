@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Annotated, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+from ..config import settings
+
+# Matches the String(100) columns on grocery_lists / grocery_list_items
+GroceryItemName = Annotated[str, StringConstraints(strip_whitespace=True, max_length=100)]
+
+class GroceryListSave(BaseModel):
+    # Bounded here so an oversized body is rejected before every item is validated
+    grocery_list: List[GroceryItemName] = Field(max_length=settings.GROCERY_LIST_MAX_ITEMS)
+    name: Optional[GroceryItemName] = None
+
+class GroceryListItemResponse(BaseModel):
+    id: int
+    ingredient_name: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+class GroceryListResponse(BaseModel):
+    id: int
+    name: Optional[str] = None
+    created_at: Optional[datetime] = None
+    items: List[GroceryListItemResponse] = []
+
+    model_config = ConfigDict(from_attributes=True)
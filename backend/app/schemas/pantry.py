@@ -1,14 +1,21 @@
-from pydantic import BaseModel
+from typing import List
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+from ..config import settings
 
 class IngredientCreate(BaseModel):
    ingredient_name: str
 
+class IngredientBulkCreate(BaseModel):
+    # Bounded here so an oversized body is rejected before every item is validated
+    ingredient_names: List[str] = Field(max_length=settings.PANTRY_BULK_MAX_ITEMS)
+
+class IngredientBulkDelete(BaseModel):
+    ingredient_ids: List[int] = Field(max_length=settings.PANTRY_BULK_MAX_ITEMS)
+
 class IngredientResponse(BaseModel):
     id: int
     ingredient_name: str
     created_at: datetime
 
-    # Pydantic v1 configuration to support from_orm
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
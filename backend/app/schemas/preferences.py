@@ -1,7 +1,7 @@
 # backend/app/schemas/preferences.py
 
 from typing import List
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class PreferencesUpdate(BaseModel):
@@ -11,5 +11,4 @@ class PreferencesUpdate(BaseModel):
 class PreferencesResponse(BaseModel):
     preferences: List[str]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
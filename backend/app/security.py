@@ -1,37 +1,58 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import TTLCache
 from .config import settings
-from .database import get_db
+from .database import get_async_db
+from .hashing import PasswordHasher
 from .models.user import User
 
 # ======================================================
-# PASSWORD HASHING (Argon2)
+# PASSWORD HASHING (Argon2, in a bounded process pool)
 # ======================================================
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+
+
+def _check_password_length(password: str) -> None:
+    if len(password) < 6:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Password too short (minimum 6 characters)."
+        )
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its Argon2 hash."""
-    try:
-        return pwd_context.verify(plain_password, hashed_password)
-    except Exception:
-        return False
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password using Argon2."""
-    if len(password) < 6:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Password too short (minimum 6 characters)."
-        )
-    return pwd_context.hash(password)
+    _check_password_length(password)
+    return password_hasher.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop."""
+    return await password_hasher.verify_async(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    _check_password_length(password)
+    return await password_hasher.hash_async(password)
 
 
 # ======================================================
@@ -64,11 +85,55 @@ def decode_token(token: str) -> dict:
         )
 
 
+# ======================================================
+# AUTHENTICATED USER CACHE
+# ======================================================
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Lightweight principal returned by get_current_user (no ORM session attached)."""
+    id: int
+    email: str
+    username: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(id=user.id, email=user.email, username=user.username)
+
+
+# Token subject (email) -> CurrentUser. Lets protected routes skip the User lookup.
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop any cached principal for this user (call after deleting/renaming users in bulk)."""
+    principal_cache.invalidate_where(lambda _email, principal: principal.id == user_id)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_user_update(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    if state.attrs.email.history.has_changes() or state.attrs.username.history.has_changes():
+        invalidate_user(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_delete(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Retrieve the currently authenticated user from the JWT token."""
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    """
+    Resolve the authenticated user from the JWT token.
+
+    Principals are cached by token subject, so the common case does no DB query.
+    """
     payload = decode_token(token)
     email: str = payload.get("sub")
 
@@ -79,7 +144,11 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.email == email).first()
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    user = await db.scalar(select(User).filter(User.email == email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -87,4 +156,6 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return user
+    principal = CurrentUser.from_user(user)
+    principal_cache.set(email, principal)
+    return principal
@@ -0,0 +1,71 @@
+"""
+JSON output helpers.
+
+Responses are rendered with orjson (ORJSONResponse is the app's default
+response class). Handlers returning ORM rows pass them to `orm_response`,
+which copies the schema's fields straight off the objects ("trusted output")
+instead of validating each row twice: once in model_validate and again
+through the route's response_model. The response_model stays on the route
+for the OpenAPI docs.
+
+Set TRUSTED_OUTPUT=false to validate every row through its schema instead
+(slower; useful while changing a schema or a model).
+"""
+
+from functools import lru_cache
+from typing import Any, Optional, Type, get_args
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from .config import settings
+
+
+def _nested_model(annotation) -> Optional[Type[BaseModel]]:
+    """The schema inside Sub / List[Sub] / Optional[List[Sub]], if any."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        nested = _nested_model(arg)
+        if nested is not None:
+            return nested
+    return None
+
+
+@lru_cache(maxsize=None)
+def _fields(schema: Type[BaseModel]) -> tuple[tuple[str, Optional[Type[BaseModel]]], ...]:
+    return tuple((name, _nested_model(field.annotation)) for name, field in schema.model_fields.items())
+
+
+def dump_trusted(schema: Type[BaseModel], obj: Any) -> dict:
+    """`schema`'s fields read off `obj` without validation (obj must already satisfy the schema)."""
+    out = {}
+    for name, nested in _fields(schema):
+        value = getattr(obj, name)
+        if nested is not None and value is not None:
+            if isinstance(value, (list, tuple)):
+                value = [dump_trusted(nested, item) for item in value]
+            else:
+                value = dump_trusted(nested, value)
+        out[name] = value
+    return out
+
+
+def dump(schema: Type[BaseModel], obj: Any) -> dict:
+    if settings.TRUSTED_OUTPUT:
+        return dump_trusted(schema, obj)
+    return schema.model_validate(obj).model_dump(mode="json")
+
+
+def orm_response(
+    schema: Type[BaseModel],
+    data: Any,
+    status_code: int = 200,
+    headers: Optional[dict] = None,
+) -> ORJSONResponse:
+    """Render one ORM row or a list of them as `schema` JSON."""
+    if isinstance(data, (list, tuple)):
+        content = [dump(schema, row) for row in data]
+    else:
+        content = dump(schema, data)
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
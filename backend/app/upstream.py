@@ -0,0 +1,244 @@
+import asyncio
+import importlib.util
+import logging
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+from .cache import TTLCache
+from .config import settings
+from .metrics import Histogram, record_upstream_time
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    """TheMealDB returned a non-200 or unparseable response (or could not be reached)."""
+
+    def __init__(self, status_code: Optional[int], message: str = ""):
+        super().__init__(message or f"TheMealDB returned status {status_code}")
+        self.status_code = status_code
+
+
+def _http2_available() -> bool:
+    # httpx only speaks HTTP/2 when the optional `h2` package is installed
+    return importlib.util.find_spec("h2") is not None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one in-flight task.
+
+    The first caller starts the work; callers arriving while it runs await the
+    same task and share its result or exception. The task is not tied to any
+    one caller, so a cancelled request does not abort it for the others.
+    """
+
+    WAITER_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+    MAX_TRACKED_KEYS = 1000
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._waiters: dict[str, int] = {}
+        self.flights = 0
+        self.coalesced = 0
+        # Waiters that joined each completed flight, and running totals per key
+        self.waiters_per_flight = Histogram(self.WAITER_BUCKETS)
+        self.coalesced_by_key: Counter = Counter()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self.flights += 1
+            self._waiters[key] = 0
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            if key in self.coalesced_by_key or len(self.coalesced_by_key) < self.MAX_TRACKED_KEYS:
+                self.coalesced_by_key[key] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        self.waiters_per_flight.observe(self._waiters.pop(key, 0))
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every caller went away
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "flights": self.flights,
+            "coalesced": self.coalesced,
+            "waiters_per_flight": self.waiters_per_flight.snapshot(),
+            "top_coalesced_keys": dict(self.coalesced_by_key.most_common(10)),
+        }
+
+
+class MealDBClient:
+    """
+    Application-lifetime TheMealDB client.
+
+    One pooled keep-alive httpx.AsyncClient is shared by all requests, and
+    JSON responses are cached per (path, params):
+      - younger than `ttl`: served from memory;
+      - younger than `ttl + stale_ttl`: served stale while one background
+        task refreshes it (stale-while-revalidate);
+      - older: fetched inline.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        ttl: float,
+        stale_ttl: float,
+        max_entries: int,
+        max_connections: int = 20,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_connections = max_connections
+        self._transport = transport
+        self._clock = clock
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl + stale_ttl, clock=clock)
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self._flights = SingleFlight()
+        self.upstream_requests = 0
+        self.stale_served = 0
+
+    # ---- lifecycle ----
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            options = {}
+            if self._transport is not None:
+                options["transport"] = self._transport
+            else:
+                options["http2"] = _http2_available()
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                **options,
+            )
+        return self._client
+
+    async def start(self) -> None:
+        self._get_client()
+
+    async def close(self) -> None:
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._refreshing.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ---- requests ----
+
+    async def _fetch(self, path: str, params: dict) -> dict:
+        self.upstream_requests += 1
+        try:
+            resp = await self._get_client().get(f"/{path.lstrip('/')}", params=params)
+        except httpx.HTTPError as exc:
+            raise UpstreamError(None, f"Could not reach TheMealDB: {exc}") from exc
+        if resp.status_code != 200:
+            raise UpstreamError(resp.status_code)
+        try:
+            data = resp.json()
+        except ValueError as exc:
+            # e.g. an HTML error page served with a 200
+            raise UpstreamError(resp.status_code, "TheMealDB returned a response that is not valid JSON") from exc
+        if not isinstance(data, dict):
+            raise UpstreamError(resp.status_code, "TheMealDB returned an unexpected JSON response")
+        return data
+
+    async def _refresh(self, key: str, path: str, params: dict) -> dict:
+        """Fetch and cache `key`; concurrent refreshes of the same key share one request."""
+
+        async def _fetch_and_store() -> dict:
+            data = await self._fetch(path, params)
+            self._cache.set(key, (self._clock(), data))
+            return data
+
+        return await self._flights.do(key, _fetch_and_store)
+
+    def _refresh_in_background(self, key: str, path: str, params: dict) -> None:
+        if key in self._refreshing:
+            return
+
+        async def _run():
+            try:
+                await self._refresh(key, path, params)
+            except Exception:
+                logger.warning("Background refresh of %s %s failed", path, params, exc_info=True)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(_run())
+
+    async def get_json(self, path: str, params: Optional[dict] = None) -> dict:
+        """GET `path` (relative to the base URL) and return its JSON body, using the cache."""
+        params = params or {}
+        key = f"{path}?{urlencode(sorted(params.items()))}"
+        cached = self._cache.get(key)
+        if cached is not None:
+            fetched_at, data = cached
+            if self._clock() - fetched_at >= self.ttl:
+                self.stale_served += 1
+                self._refresh_in_background(key, path, params)
+            return data
+        # Time this caller actually waited (shared single-flight waits count for each waiter)
+        started = time.perf_counter()
+        try:
+            return await self._refresh(key, path, params)
+        finally:
+            record_upstream_time(time.perf_counter() - started)
+
+    async def ping(self) -> int:
+        """Status code of a tiny uncached request (for health probes); raises UpstreamError if unreachable."""
+        try:
+            resp = await self._get_client().get("/list.php", params={"c": "list"})
+        except httpx.HTTPError as exc:
+            raise UpstreamError(None, f"Could not reach TheMealDB: {exc}") from exc
+        return resp.status_code
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "http2": bool(self._client and self._transport is None and _http2_available()),
+            "upstream_requests": self.upstream_requests,
+            "stale_served": self.stale_served,
+            "refreshing": len(self._refreshing),
+            "cache": self._cache.stats(),
+            "single_flight": self._flights.stats(),
+        }
+
+
+mealdb = MealDBClient(
+    base_url=settings.THEMEALDB_BASE_URL,
+    timeout=settings.THEMEALDB_TIMEOUT_SECONDS,
+    ttl=settings.THEMEALDB_CACHE_TTL_SECONDS,
+    stale_ttl=settings.THEMEALDB_CACHE_STALE_SECONDS,
+    max_entries=settings.THEMEALDB_CACHE_MAX_ENTRIES,
+    max_connections=settings.THEMEALDB_MAX_CONNECTIONS,
+)
+
+
+def get_mealdb() -> MealDBClient:
+    """Dependency for the shared client (app.dependency_overrides swaps in a stub)."""
+    return mealdb
@@ -0,0 +1,69 @@
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models.collection_version import CollectionVersion
+
+PANTRY = "pantry"
+FAVORITES = "favorites"
+
+# Upper bound for ?limit= on keyset-paginated listings
+MAX_PAGE_SIZE = 500
+
+
+async def get_version(db: AsyncSession, user_id: int, collection: str) -> int:
+    """Current version of a user's collection (0 if it was never written)."""
+    version = await db.scalar(
+        select(CollectionVersion.version).filter(
+            CollectionVersion.user_id == user_id,
+            CollectionVersion.collection == collection,
+        )
+    )
+    return version or 0
+
+
+async def bump_version(db: AsyncSession, user_id: int, collection: str) -> None:
+    """Increment the collection version inside the caller's transaction (upsert)."""
+    row = {"user_id": user_id, "collection": collection, "version": 1}
+    dialect_name = db.bind.dialect.name
+    table = CollectionVersion.__table__
+    if dialect_name == "mysql":
+        stmt = mysql_insert(table).values(row)
+        stmt = stmt.on_duplicate_key_update(version=table.c.version + 1)
+    elif dialect_name in ("sqlite", "postgresql"):
+        upsert = sqlite_insert if dialect_name == "sqlite" else postgresql_insert
+        stmt = upsert(table).values(row).on_conflict_do_update(
+            index_elements=["user_id", "collection"],
+            set_={"version": table.c.version + 1},
+        )
+    else:
+        stmt = insert(table).values(row)
+    await db.execute(stmt)
+
+
+def make_etag(collection: str, user_id: int, version: int, *variant) -> str:
+    """Weak ETag for one view (e.g. page) of a user's collection at a given version."""
+    suffix = "-".join("" if v is None else str(v) for v in variant)
+    return f'W/"{collection}-{user_id}-{version}-{suffix}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 7232 weak comparison of an If-None-Match header against our ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    ours = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == ours for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A bodyless 304 if the client already holds `etag`, else None."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
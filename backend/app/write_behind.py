@@ -0,0 +1,229 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import case, insert, update
+
+from .config import settings
+from .database import AsyncSessionLocal
+from .models.support_message import SupportMessage
+from .models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE statement; keeps the CASE expression and IN list bounded.
+LAST_LOGIN_CHUNK_SIZE = 1000
+
+
+class LastLoginBuffer:
+    """
+    Coalesces users.last_login writes in memory and flushes them periodically.
+
+    Repeated logins by the same user between flushes collapse into one entry,
+    and each flush is a single transaction of bulk UPDATE ... CASE statements,
+    so /api/login never waits on a write.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, interval: float = 5.0):
+        self._session_factory = session_factory
+        self.interval = interval
+        self._pending: dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.flushed_rows = 0
+        self.flush_errors = 0
+
+    def record(self, user_id: int, when: Optional[datetime] = None) -> None:
+        """Remember that `user_id` logged in (the latest timestamp wins)."""
+        self._pending[user_id] = when or datetime.utcnow()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """Write all buffered timestamps; returns the number of users updated."""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        user_ids = list(batch)
+        try:
+            async with self._session_factory() as db:
+                for start in range(0, len(user_ids), LAST_LOGIN_CHUNK_SIZE):
+                    chunk = {uid: batch[uid] for uid in user_ids[start:start + LAST_LOGIN_CHUNK_SIZE]}
+                    await db.execute(
+                        update(User)
+                        .where(User.id.in_(chunk))
+                        .values(last_login=case(chunk, value=User.id))
+                        .execution_options(synchronize_session=False)
+                    )
+                await db.commit()
+        except Exception:
+            # Keep the timestamps for the next attempt unless a newer login replaced them
+            for uid, when in batch.items():
+                self._pending.setdefault(uid, when)
+            self.flush_errors += 1
+            raise
+        self.flushed_rows += len(batch)
+        return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush last_login updates")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic task and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to flush last_login updates on shutdown")
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "flushed_rows": self.flushed_rows,
+            "flush_errors": self.flush_errors,
+            "interval_seconds": self.interval,
+        }
+
+
+class SupportMessageQueue:
+    """
+    Bounded in-memory queue of support messages, written in batches.
+
+    The public /send_message endpoints only append here and answer 202; a
+    background task writes up to `batch_size` rows per INSERT/commit every
+    `interval` seconds (sooner once a full batch is waiting). When
+    `max_pending` messages are queued, offer() refuses instead of growing.
+    A failed batch goes back in front of the queue; if messages accepted
+    during the flush leave no room for all of it, the newest are dropped
+    (and counted) so the bound still holds.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        max_pending: int = 1000,
+        batch_size: int = 200,
+        interval: float = 1.0,
+    ):
+        self._session_factory = session_factory
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending: deque = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.accepted = 0
+        self.rejected = 0
+        self.flushed_rows = 0
+        self.flush_errors = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def offer(self, name: str, email: str, message: str) -> bool:
+        """Queue a message; False if the queue is full."""
+        if len(self._pending) >= self.max_pending:
+            self.rejected += 1
+            return False
+        self._pending.append({
+            "name": name, "email": email, "message": message, "created_at": datetime.utcnow(),
+        })
+        self.accepted += 1
+        if self._wakeup is not None and len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> int:
+        """Write everything queued, one multi-row INSERT + commit per batch. Returns rows written."""
+        written = 0
+        while self._pending:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            try:
+                async with self._session_factory() as db:
+                    await db.execute(insert(SupportMessage), batch)
+                    await db.commit()
+            except Exception:
+                # Put the batch back in front, in order, for the next attempt
+                self._pending.extendleft(reversed(batch))
+                self.flush_errors += 1
+                overflow = len(self._pending) - self.max_pending
+                if overflow > 0:
+                    for _ in range(overflow):
+                        self._pending.pop()
+                    self.dropped += overflow
+                    logger.error("Support queue full after a failed flush; dropped the %d newest messages", overflow)
+                raise
+            written += len(batch)
+            self.flushed_rows += len(batch)
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush support messages")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and drain the queue."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to drain %d support messages on shutdown", len(self._pending))
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "flushed_rows": self.flushed_rows,
+            "flush_errors": self.flush_errors,
+            "dropped": self.dropped,
+            "batch_size": self.batch_size,
+            "interval_seconds": self.interval,
+        }
+
+
+last_login_buffer = LastLoginBuffer(interval=settings.LAST_LOGIN_FLUSH_INTERVAL_SECONDS)
+support_queue = SupportMessageQueue(
+    max_pending=settings.SUPPORT_QUEUE_MAX_PENDING,
+    batch_size=settings.SUPPORT_FLUSH_BATCH_SIZE,
+    interval=settings.SUPPORT_FLUSH_INTERVAL_SECONDS,
+)
@@ -1,14 +1,29 @@
 # conftest.py
+import asyncio
+import os
+
+# DATABASE_URL selects the test database: the app's own engines (sync + async,
+# used by every route via get_async_db and by its background tasks) point at it.
+# Must happen before `app` is imported, since engines are created at import time.
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+# The background health probe must not call the real TheMealDB during tests
+os.environ.setdefault("HEALTH_CHECK_UPSTREAM", "false")
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
-from app.database import Base, get_db
+from app import upstream
+from app.database import Base, async_engine
 from app.main import app
+from app.models.user import User
+from app.rate_limit import rate_limiter
+from app.security import create_access_token
+from benchmarks.endpoints import mealdb_client
 
-# Use a local SQLite file just for tests
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Same database the app uses, for arranging and inspecting data in tests
+SQLALCHEMY_DATABASE_URL = os.environ["DATABASE_URL"]
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -34,6 +49,12 @@ def setup_db():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Every test starts with full rate-limit buckets (all test requests share one client IP)."""
+    asyncio.run(rate_limiter.reset())
+
+
 @pytest.fixture()
 def db():
     """
@@ -54,18 +75,77 @@ def db():
 @pytest.fixture()
 def client(db):
     """
-    FastAPI TestClient that uses the test database by overriding get_db.
+    FastAPI TestClient with the app's startup/shutdown events. No dependency
+    overrides: routes use the test database through DATABASE_URL (see above),
+    and data committed through `db` is visible to them.
     """
+    with TestClient(app) as c:
+        yield c
 
-    def override_get_db():
-        try:
-            yield db
-        finally:
-            pass
 
-    app.dependency_overrides[get_db] = override_get_db
+@pytest.fixture()
+def auth_headers(db):
+    """Factory: create a user with this email and return Bearer headers for it (the `sub` is the email)."""
 
-    with TestClient(app) as c:
-        yield c
+    def make(email: str) -> dict:
+        db.add(User(username=email.split("@")[0], email=email, password_hash="hash"))
+        db.commit()
+        return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+
+    return make
+
+
+@pytest.fixture()
+def stub_mealdb(monkeypatch):
+    """
+    Factory: a TheMealDB client answered by `handler` (an httpx.MockTransport
+    handler) instead of the network. Unless install=False it also replaces the
+    app's shared client for the duration of the test.
+    """
+
+    def make(handler, install: bool = True, **overrides):
+        client = mealdb_client(handler, **overrides)
+        if install:
+            monkeypatch.setattr(upstream, "mealdb", client)
+        return client
 
-    app.dependency_overrides.clear()
+    return make
+
+
+class StatementRecorder:
+    """SQL statements sent through the app's async engine while the fixture is active."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def clear(self) -> None:
+        self.statements.clear()
+
+    def matching(self, fragment: str) -> list[str]:
+        return [s for s in self.statements if fragment in s]
+
+
+@pytest.fixture()
+def sql_statements():
+    recorder = StatementRecorder()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", recorder)
+    yield recorder
+    event.remove(async_engine.sync_engine, "before_cursor_execute", recorder)
+
+
+class FakeClock:
+    """Injectable clock (callable returning `now`) for TTL / token-bucket tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def fake_clock():
+    return FakeClock()
@@ -0,0 +1,35 @@
+# backend_testing/test_benchmarks.py
+
+import asyncio
+
+from app.catalog import recipe_catalog
+from app.main import app
+from benchmarks.endpoints import STUB_RECIPES, percentile, run_workload, stubbed_upstream
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_endpoint_benchmark_runs_every_action_without_errors(client):
+    catalog_size = len(recipe_catalog)
+
+    async def scenario():
+        async with stubbed_upstream(app):
+            return await run_workload(app, users=2, concurrency=2, actions=40, seed=7)
+
+    result = asyncio.run(scenario())
+    assert result["errors"] == 0
+    assert result["requests"] == 2 * (2 + 40)  # register + login, then one request per action
+    assert {"POST /api/register", "POST /api/login", "GET /api/recipes/recommendations"} <= set(result["endpoints"])
+    for stats in result["endpoints"].values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+    # The stubs are served through dependency overrides; the shared catalog is untouched
+    assert app.dependency_overrides == {}
+    assert len(recipe_catalog) == catalog_size
+    assert all(recipe_id not in recipe_catalog for recipe_id, *_ in STUB_RECIPES)
@@ -0,0 +1,36 @@
+# backend_testing/test_cache.py
+
+from app.cache import TTLCache
+
+
+def test_ttl_cache_expires_entries(fake_clock):
+    cache = TTLCache(maxsize=10, ttl=5, clock=fake_clock)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    fake_clock.now = 6
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_is_bounded_lru():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_invalidate_where():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("x", 1)
+    cache.set("y", 2)
+    assert cache.invalidate_where(lambda k, v: v == 2) == 1
+    assert cache.get("y") is None
+    assert cache.get("x") == 1
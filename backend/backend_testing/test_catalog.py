@@ -0,0 +1,123 @@
+# backend_testing/test_catalog.py
+
+import asyncio
+import json
+
+import httpx
+
+from app.catalog import (
+    RecipeCatalog, get_recipe_catalog, main, normalize_ingredient, parse_meal, read_meals, recipe_catalog, ingest_meals,
+)
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models.recipe import Recipe
+
+MEALS = [
+    {
+        "idMeal": "52771", "strMeal": "Spicy Arrabiata Penne", "strCategory": "Vegetarian",
+        "strMealThumb": "https://example.com/penne.jpg",
+        "strIngredient1": "penne rigate", "strMeasure1": "1 pound",
+        "strIngredient2": "Garlic", "strMeasure2": "3 cloves",
+        "strIngredient3": "Chopped tomatoes", "strMeasure3": "1 tin",
+        "strIngredient4": "", "strIngredient5": None,
+    },
+    {
+        "idMeal": "52772", "strMeal": "Teriyaki Chicken", "strCategory": "Chicken",
+        "strIngredient1": "Chicken Thighs", "strMeasure1": "2",
+        "strIngredient2": "garlic", "strMeasure2": "1 clove",
+    },
+]
+
+
+def _lookup_stub(stub_mealdb, status_code=200):
+    """Install a TheMealDB lookup.php backed by MEALS; returns the looked-up ids."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        recipe_id = request.url.params.get("i")
+        calls.append(recipe_id)
+        meals = [m for m in MEALS if m["idMeal"] == recipe_id]
+        return httpx.Response(status_code, json={"meals": meals or None})
+
+    stub_mealdb(handler)
+    return calls
+
+
+def _load_catalog():
+    async def _load():
+        async with AsyncSessionLocal() as db:
+            return await recipe_catalog.load(db)
+    return asyncio.run(_load())
+
+
+def test_normalize_ingredient():
+    assert normalize_ingredient("  Chicken_Thighs ") == "chicken thigh"
+    assert normalize_ingredient("Tomatoes") == "tomato"
+    assert normalize_ingredient("Cherries") == "cherry"
+    assert normalize_ingredient("Swiss") == "swiss"
+
+
+def test_parse_meal_skips_blank_ingredients():
+    recipe = parse_meal(MEALS[0])
+    assert recipe.id == 52771
+    assert [i.normalized_name for i in recipe.ingredients] == ["penne rigate", "garlic", "chopped tomato"]
+    assert recipe.ingredients[0].measure == "1 pound"
+
+
+def test_ingest_and_inverted_index(db):
+    assert ingest_meals(db, MEALS) == 2
+    # Re-ingesting replaces rather than duplicates
+    assert ingest_meals(db, MEALS[:1]) == 1
+    assert db.query(Recipe).count() >= 2
+
+    assert _load_catalog() >= 2
+    assert recipe_catalog.recipes_with("Garlic") >= {52771, 52772}
+    assert recipe_catalog.get(52772).name == "Teriyaki Chicken"
+    ranked = recipe_catalog.match(["garlic", "chicken thighs"])
+    assert ranked[0] == (52772, 2)
+
+
+def test_ingest_command_reads_dump_files(tmp_path, db):
+    dump = tmp_path / "meals.json"
+    dump.write_text(json.dumps({"meals": MEALS}))
+    assert len(read_meals(str(dump))) == 2
+    assert main(["ingest", str(dump)]) == 0
+
+
+def test_generate_grocery_list_uses_catalog(client, db, stub_mealdb, auth_headers):
+    lookups = _lookup_stub(stub_mealdb)
+    ingest_meals(db, MEALS)
+    _load_catalog()
+
+    headers = auth_headers("groceryuser@example.com")
+    assert client.post("/api/pantry/", json={"ingredient_name": "garlic"}, headers=headers).status_code == 201
+
+    res = client.post("/api/grocery-list/generate", json=[52771, 99999], headers=headers)
+    assert res.status_code == 200
+    body = res.json()
+    assert body["grocery_list"] == ["chopped tomato", "penne rigate"]
+    assert body["unknown_recipe_ids"] == [99999]
+    assert lookups == ["99999"]  # only the id the catalog lacks
+
+
+def test_generate_grocery_list_falls_back_to_mealdb_without_catalog(client, stub_mealdb, auth_headers):
+    lookups = _lookup_stub(stub_mealdb)
+    headers = auth_headers("nocatalog@example.com")
+    client.post("/api/pantry/", json={"ingredient_name": "Garlic"}, headers=headers)
+
+    app.dependency_overrides[get_recipe_catalog] = RecipeCatalog  # never ingested
+    try:
+        res = client.post("/api/grocery-list/generate", json=[52772, 52771], headers=headers)
+        assert res.status_code == 200
+        assert res.json() == {
+            "grocery_list": ["chicken thigh", "chopped tomato", "penne rigate"],
+            "unknown_recipe_ids": [],
+        }
+        assert sorted(lookups) == ["52771", "52772"]
+
+        _lookup_stub(stub_mealdb, status_code=503)
+        res = client.post("/api/grocery-list/generate", json=[52772], headers=headers)
+        assert res.status_code == 502
+        assert "status 503" in res.json()["detail"]
+    finally:
+        app.dependency_overrides.pop(get_recipe_catalog)
@@ -0,0 +1,69 @@
+# backend_testing/test_database.py
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.config import Settings
+from app.database import InstrumentedQueuePool, install_idle_pre_ping, pool_status
+
+
+def test_async_database_url_uses_async_drivers():
+    s = Settings()
+    s.DATABASE_URL_OVERRIDE = "mysql+pymysql://root:pw@db:3306/itsc4155"
+    assert s.ASYNC_DATABASE_URL == "mysql+aiomysql://root:pw@db:3306/itsc4155"
+
+    s.DATABASE_URL_OVERRIDE = "sqlite:///./test.db"
+    assert s.ASYNC_DATABASE_URL == "sqlite+aiosqlite:///./test.db"
+
+
+def _small_pool_engine():
+    return create_engine(
+        "sqlite:///./test.db",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+
+def test_pool_status_reports_usage_and_checkout_waits():
+    test_engine = _small_pool_engine()
+    conn = test_engine.connect()
+    try:
+        status = pool_status(test_engine)
+        assert status["pool_class"] == "InstrumentedQueuePool"
+        assert status["checked_out"] == 1
+        assert status["idle"] == 0
+
+        with pytest.raises(exc.TimeoutError):
+            test_engine.connect()
+
+        status = pool_status(test_engine)
+        assert status["checkout_timeouts"] == 1
+        assert status["checkout_wait_seconds"]["count"] == 2
+    finally:
+        conn.close()
+        test_engine.dispose()
+
+
+def test_idle_pre_ping_replaces_dead_connection(monkeypatch):
+    test_engine = _small_pool_engine()
+    install_idle_pre_ping(test_engine, idle_seconds=0)
+    pings = []
+
+    def fake_ping(dbapi_connection):
+        pings.append(dbapi_connection)
+        return len(pings) > 1  # first ping reports a dead connection
+
+    monkeypatch.setattr(test_engine.dialect, "do_ping", fake_ping)
+    try:
+        with test_engine.connect() as conn:  # fresh connection: no ping
+            first = conn.connection.dbapi_connection
+        assert pings == []
+
+        with test_engine.connect() as conn:  # idle + dead -> replaced
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+            assert conn.connection.dbapi_connection is not first
+        assert len(pings) == 1
+    finally:
+        test_engine.dispose()
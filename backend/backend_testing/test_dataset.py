@@ -0,0 +1,38 @@
+# backend_testing/test_dataset.py
+
+import random
+
+from sqlalchemy import create_engine, func, select
+
+from app.models import FavoriteRecipe, User, UserIngredient
+from benchmarks.dataset import DatasetConfig, DatasetGenerator, ZipfSampler
+
+
+def test_zipf_sampler_favors_low_ranks():
+    sampler = ZipfSampler(100, 1.1, random.Random(3))
+    draws = [sampler.sample() for _ in range(5000)]
+    assert draws.count(0) > draws.count(9) > draws.count(99)
+    assert len(set(sampler.sample_distinct(20))) == 20
+
+
+def test_generator_loads_skewed_data_and_can_append(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dataset.db'}")
+    config = DatasetConfig(users=300, batch_size=100, ingredients=200, recipes=100)
+
+    counts = DatasetGenerator(engine, config, seed=5).run()
+    assert counts["users"] == 300
+    assert counts["recipe_payloads"] == 100
+
+    with engine.connect() as conn:
+        by_ingredient = dict(conn.execute(
+            select(UserIngredient.ingredient_name, func.count()).group_by(UserIngredient.ingredient_name)
+        ).all())
+        assert by_ingredient["salt"] > by_ingredient.get("ingredient 00100", 0)
+        assert conn.scalar(select(func.count()).select_from(FavoriteRecipe)) == counts["favorites"]
+
+    # A second run continues after the existing ids and reuses the stored payloads
+    counts = DatasetGenerator(engine, config, seed=6).run()
+    assert "recipe_payloads" not in counts
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(User)) == 600
+    engine.dispose()
@@ -0,0 +1,108 @@
+# backend_testing/test_dietary.py
+
+from app.catalog import RecipeCatalog, RecipeSummary
+from app.dietary import KeywordAutomaton, compile_filter
+
+
+def test_automaton_matches_whole_words_and_plurals():
+    automaton = KeywordAutomaton(["egg", "nut", "ham", "pine nut", "tomato"])
+    assert automaton.find("2 eggs, beaten") == "egg"
+    assert automaton.find("toasted pine nuts") in ("nut", "pine nut")
+    assert automaton.find("cherry tomatoes") == "tomato"
+    assert automaton.find("eggplant") is None
+    assert automaton.find("nutmeg and coconut") is None
+    assert automaton.find("graham crackers") is None
+
+
+def test_automaton_handles_overlapping_keywords():
+    automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+    assert automaton.find("ushers") is None  # no whole-word hit
+    assert automaton.find("u she rs") == "she"
+    assert automaton.find("x hers") == "hers"
+
+
+def test_automaton_ignores_keywords_inside_exception_phrases():
+    automaton = KeywordAutomaton(["milk", "butter", "peanut"], {"coconut milk": "milk", "peanut butter": "butter",
+                                                                "butter bean": "butter"})
+    assert automaton.find("coconut milk") is None
+    assert automaton.find("1 tin coconut milk\nwhole milk") == "milk"
+    assert automaton.find("butter beans") is None  # the phrase ends after the keyword
+    assert automaton.find("butter") == "butter"
+    assert automaton.find("peanut butter") == "peanut"  # excuses only "butter"
+
+
+def test_plant_based_ingredients_pass_vegan_and_dairy_free():
+    vegan = compile_filter(["vegan"])
+    assert vegan.allows("Thai Green Curry", ["coconut milk", "tofu", "green curry paste"])
+    assert vegan.allows("Peanut Butter Noodles", ["rice noodles", "peanut butter", "soy sauce"])
+    assert vegan.allows("Bean Stew", ["butter beans", "tomatoes"])
+    assert vegan.allows("Smoothie", ["oat milk", "banana", "coconut yogurt"])
+    assert not vegan.allows("Korma", ["coconut milk", "double cream"])
+    assert not vegan.allows("Toast", ["bread", "peanut butter", "butter"])
+
+    dairy_free = compile_filter(["dairy_free"])
+    assert dairy_free.allows("Coconut Milk Rice", ["rice", "coconut milk"])
+    assert not dairy_free.allows("Milk Pudding", ["milk", "rice"])
+
+    vegan_nut_free = compile_filter(["vegan", "nut_free"])
+    assert not vegan_nut_free.allows("Satay", ["peanut butter"])  # still a nut
+    assert vegan_nut_free.allows("Stir Fry", ["water chestnuts", "rice"])
+
+    gluten_free = compile_filter(["gluten_free"])
+    assert gluten_free.allows("Pho", ["rice noodles", "beef"])
+    assert not gluten_free.allows("Ramen", ["wheat noodles"])
+
+
+def test_filter_checks_name_ingredients_and_category():
+    vegetarian = compile_filter(["Vegetarian"])
+    assert vegetarian.allows("Mushroom Risotto", ["arborio rice", "mushrooms", "parmesan"])
+    assert not vegetarian.allows("Chicken Curry")
+    assert not vegetarian.allows("Carbonara", ["spaghetti", "bacon", "egg"])
+    assert not vegetarian.allows("Paella", ["rice"], category="Seafood")
+
+    vegan = compile_filter(["vegan"])
+    assert not vegan.allows("Mushroom Risotto", ["arborio rice", "mushrooms", "parmesan"])
+
+    gluten_free_nut_free = compile_filter(["gluten-free", "nut_free"])
+    assert not gluten_free_nut_free.allows("Satay", ["peanut butter"])
+    assert not gluten_free_nut_free.allows("Garlic Bread")
+    assert gluten_free_nut_free.allows("Rice Bowl", ["rice", "nutmeg"])
+
+
+def test_filter_matches_catalog_normalized_ingredient_names():
+    catalog = RecipeCatalog()
+    catalog.add(RecipeSummary(1, "Flapjacks"), ["Rolled Oats", "golden syrup"])
+    catalog.add(RecipeSummary(2, "Croquettes"), ["Potatoes", "Breadcrumbs"])
+    catalog.add(RecipeSummary(3, "Corn Side"), ["Creamed corn"])
+    catalog.add(RecipeSummary(4, "Anchovy Toast"), ["Anchovies"])
+    assert catalog.ingredients_of(1) == ("rolled oat", "golden syrup")
+    meals = [{"idMeal": str(n), "strMeal": catalog.get(n).name} for n in (1, 2, 3, 4)]
+
+    gluten_free = compile_filter(["gluten_free"])
+    assert gluten_free.violation("x", ["oat"]) == "oat"
+    assert gluten_free.violation("x", ["breadcrumb"]) == "breadcrumb"
+    assert [m["idMeal"] for m in gluten_free.filter_meals(meals, catalog)] == ["3", "4"]
+
+    dairy_free = compile_filter(["dairy_free"])
+    assert [m["idMeal"] for m in dairy_free.filter_meals(meals, catalog)] == ["1", "2", "4"]
+    assert compile_filter(["vegetarian"]).violation("x", catalog.ingredients_of(4)) == "anchovy"
+
+
+def test_unsupported_preferences_are_ignored_and_filters_are_cached():
+    assert not compile_filter(["halal"]).active
+    assert compile_filter(["vegan", "nut_free"]) is compile_filter(["nut_free", "vegan"])
+
+
+def test_filter_meals_uses_catalog_ingredients():
+    catalog = RecipeCatalog()
+    catalog.add(RecipeSummary(1, "Harvest Salad"), ["lettuce", "bacon bits"])
+    catalog.add(RecipeSummary(2, "Green Salad"), ["lettuce", "cucumber"])
+    meals = [
+        {"idMeal": "1", "strMeal": "Harvest Salad"},
+        {"idMeal": "2", "strMeal": "Green Salad"},
+        {"idMeal": "3", "strMeal": "Beef Stew"},  # not in catalog: name check only
+        {"idMeal": "4", "strMeal": "Lentil Soup"},
+    ]
+    kept = compile_filter(["vegetarian"]).filter_meals(meals, catalog)
+    assert [m["idMeal"] for m in kept] == ["2", "4"]
+    assert compile_filter([]).filter_meals(meals, catalog) == meals
@@ -0,0 +1,124 @@
+# backend_testing/test_favorites.py
+
+from sqlalchemy import event
+
+from app.database import async_engine
+from app.models import FavoriteRecipe, RecipePayload, User
+from app.payloads import decode_payload, migrate_favorites, payload_cache
+
+
+def _favorite(client, headers, recipe_id):
+    return client.post(
+        f"/api/favorites/{recipe_id}",
+        json={"recipe_json": {"idMeal": recipe_id, "strMeal": f"Meal {recipe_id}"}},
+        headers=headers,
+    )
+
+
+def test_favorites_etag_changes_on_add_and_remove(client, db, auth_headers):
+    headers = auth_headers("fav@example.com")
+    assert _favorite(client, headers, "52772").status_code == 201
+
+    etag = client.get("/api/favorites/", headers=headers).headers["etag"]
+    assert client.get("/api/favorites/", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    # re-adding an existing favorite is not a change
+    _favorite(client, headers, "52772")
+    assert client.get("/api/favorites/", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    client.delete("/api/favorites/52772", headers=headers)
+    res = client.get("/api/favorites/", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json() == []
+
+
+def test_favorites_keyset_pagination(client, db, auth_headers):
+    headers = auth_headers("favpages@example.com")
+    for recipe_id in ("1", "2", "3"):
+        _favorite(client, headers, recipe_id)
+
+    page1 = client.get("/api/favorites/?limit=2", headers=headers)
+    assert [f["recipe_id"] for f in page1.json()] == ["1", "2"]
+
+    page2 = client.get(
+        f"/api/favorites/?limit=2&after_id={page1.headers['x-next-after-id']}", headers=headers
+    )
+    assert [f["recipe_id"] for f in page2.json()] == ["3"]
+
+
+RECIPE = {"id": "53001", "name": "Teriyaki Chicken", "instructions": "Preheat oven. " * 40}
+
+
+def test_favorites_share_one_compressed_payload(client, db, auth_headers):
+    for email in ("share1@example.com", "share2@example.com"):
+        headers = auth_headers(email)
+        res = client.post("/api/favorites/53001", json={"recipe_json": RECIPE}, headers=headers)
+        assert res.status_code == 201
+        assert res.json()["recipe_json"] == RECIPE
+
+    payloads = db.query(RecipePayload).filter(RecipePayload.recipe_id == "53001").all()
+    assert len(payloads) == 1
+    assert payloads[0].name == "Teriyaki Chicken"
+    assert payloads[0].encoding in ("zlib", "zstd")
+    assert len(payloads[0].data) < len(RECIPE["instructions"])
+    assert decode_payload(payloads[0].encoding, payloads[0].data) == RECIPE
+
+    payload_cache.clear()
+    listing = client.get("/api/favorites/", headers=headers).json()
+    assert listing[0]["recipe_json"] == RECIPE
+
+
+def test_migrate_moves_inline_recipe_json_to_payloads(client, db, auth_headers):
+    headers = auth_headers("legacy@example.com")
+    user = db.query(User).filter(User.email == "legacy@example.com").one()
+    db.add_all([
+        FavoriteRecipe(user_id=user.id, recipe_id="111", recipe_json={"id": "111", "name": "Old"}),
+        FavoriteRecipe(user_id=user.id, recipe_id="222", recipe_json={"id": "222", "name": "Older"}),
+    ])
+    db.commit()
+
+    assert migrate_favorites(db, batch_size=1) == 2
+    rows = db.query(FavoriteRecipe).filter(FavoriteRecipe.user_id == user.id).all()
+    assert all(r.payload_id is not None and r.recipe_json is None for r in rows)
+
+    listing = client.get("/api/favorites/", headers=headers).json()
+    assert [f["recipe_json"]["name"] for f in listing] == ["Old", "Older"]
+
+
+def test_fields_projection_skips_payload_blobs(client, db, sql_statements, auth_headers):
+    headers = auth_headers("grid@example.com")
+    client.post("/api/favorites/53002", json={"recipe_json": {"name": "Pad Thai", "thumbnail": "t.jpg"}}, headers=headers)
+    user = db.query(User).filter(User.email == "grid@example.com").one()
+    db.add(FavoriteRecipe(user_id=user.id, recipe_id="53003", recipe_json={"strMeal": "Legacy", "strMealThumb": "l.jpg"}))
+    db.commit()
+
+    sql_statements.clear()
+    res = client.get("/api/favorites/?fields=id,name,thumbnail", headers=headers)
+
+    assert res.status_code == 200
+    assert [(f["name"], f["thumbnail"]) for f in res.json()] == [("Pad Thai", "t.jpg"), ("Legacy", "l.jpg")]
+    assert set(res.json()[0]) == {"id", "name", "thumbnail"}
+    assert not sql_statements.matching("recipe_payloads.data")
+
+    assert client.get("/api/favorites/?fields=id,secret", headers=headers).status_code == 400
+
+
+def test_unpaged_listing_streams_json_array(client, db, auth_headers):
+    headers = auth_headers("stream@example.com")
+    for n in range(5):
+        _favorite(client, headers, f"54{n:03d}")
+
+    checkouts = []
+    listener = lambda *args: checkouts.append(1)
+    event.listen(async_engine.sync_engine.pool, "checkout", listener)
+    try:
+        res = client.get("/api/favorites/", headers=headers)
+    finally:
+        event.remove(async_engine.sync_engine.pool, "checkout", listener)
+    assert len(checkouts) == 1  # version check and streamed rows share the request's connection
+    assert res.headers["content-type"] == "application/json"
+    assert "etag" in res.headers
+    body = res.json()
+    assert [f["recipe_id"] for f in body] == [f"54{n:03d}" for n in range(5)]
+    assert body[0]["recipe_json"]["strMeal"] == "Meal 54000"
+    assert set(body[0]) == {"id", "recipe_id", "recipe_json", "created_at"}
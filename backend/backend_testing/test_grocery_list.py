@@ -0,0 +1,98 @@
+# backend_testing/test_grocery_list.py
+
+from sqlalchemy import update
+
+from app.config import settings
+from app.models import GroceryList, GroceryListItem, User
+
+
+def test_save_grocery_list_uses_one_items_statement(client, db, sql_statements, auth_headers):
+    headers = auth_headers("grocerysave@example.com")
+    items = [f"item {i}" for i in range(200)]
+
+    sql_statements.clear()
+    res = client.post("/api/grocery-list/save", json={"grocery_list": items + ["item 0", " "]}, headers=headers)
+
+    assert res.status_code == 200
+    assert res.json()["item_count"] == 200
+    # one INSERT for the list, one (executemany) INSERT for all its items
+    assert len(sql_statements.matching("grocery_list")) == 2
+
+    saved = db.query(GroceryList).filter(GroceryList.id == res.json()["list_id"]).one()
+    assert db.query(GroceryListItem).filter(GroceryListItem.grocery_list_id == saved.id).count() == 200
+
+
+def test_save_grocery_list_validates_payload(client, db, auth_headers):
+    headers = auth_headers("grocerybad@example.com")
+    assert client.post("/api/grocery-list/save", json={"grocery_list": []}, headers=headers).status_code == 400
+    assert client.post("/api/grocery-list/save", json={"items": ["milk"]}, headers=headers).status_code == 422
+
+    too_many = [f"item {i}" for i in range(settings.GROCERY_LIST_MAX_ITEMS + 1)]
+    res = client.post("/api/grocery-list/save", json={"grocery_list": too_many}, headers=headers)
+    assert res.status_code == 422
+    assert res.json()["detail"][0]["type"] == "too_long"
+    user = db.query(User).filter(User.email == "grocerybad@example.com").one()
+    assert db.query(GroceryList).filter(GroceryList.user_id == user.id).count() == 0
+
+
+def _count_grocery_queries(client, sql_statements, url, headers):
+    sql_statements.clear()
+    res = client.get(url, headers=headers)
+    assert res.status_code == 200
+    return res, len(sql_statements.matching("grocery_list"))
+
+
+def test_list_grocery_lists_query_count_is_constant(client, db, sql_statements, auth_headers):
+    headers = auth_headers("groceryread@example.com")
+    client.post("/api/grocery-list/save", json={"grocery_list": ["milk", "eggs"]}, headers=headers)
+    _, queries_for_one = _count_grocery_queries(client, sql_statements, "/api/grocery-list/", headers)
+
+    for n in range(5):
+        client.post("/api/grocery-list/save", json={"grocery_list": [f"a{n}", f"b{n}"]}, headers=headers)
+    res, queries_for_six = _count_grocery_queries(client, sql_statements, "/api/grocery-list/", headers)
+
+    assert queries_for_one == queries_for_six == 2
+    lists = res.json()
+    assert len(lists) == 6
+    assert all(len(g["items"]) == 2 for g in lists)
+
+
+def test_grocery_lists_paginate_newest_first(client, db, auth_headers):
+    headers = auth_headers("grocerypages@example.com")
+    ids = [
+        client.post("/api/grocery-list/save", json={"grocery_list": [f"x{n}"]}, headers=headers).json()["list_id"]
+        for n in range(3)
+    ]
+
+    page1 = client.get("/api/grocery-list/?limit=2", headers=headers)
+    assert [g["id"] for g in page1.json()] == ids[:0:-1]
+    page2 = client.get(f"/api/grocery-list/?limit=2&cursor={page1.headers['x-next-cursor']}", headers=headers)
+    assert [g["id"] for g in page2.json()] == ids[:1]
+
+    single = client.get(f"/api/grocery-list/{ids[0]}", headers=headers)
+    assert single.json()["items"][0]["ingredient_name"] == "x0"
+    other = auth_headers("grocerysnoop@example.com")
+    assert client.get(f"/api/grocery-list/{ids[0]}", headers=other).status_code == 404
+
+
+def test_grocery_list_paging_handles_lists_without_created_at(client, db, auth_headers, sql_statements):
+    headers = auth_headers("grocerylegacy@example.com")
+    ids = [
+        client.post("/api/grocery-list/save", json={"grocery_list": [f"y{n}"]}, headers=headers).json()["list_id"]
+        for n in range(3)
+    ]
+    # e.g. rows written by an older client that did not set created_at
+    db.execute(update(GroceryList).where(GroceryList.id.in_(ids[:2])).values(created_at=None))
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        res = client.get("/api/grocery-list/?limit=1" + (f"&cursor={cursor}" if cursor else ""), headers=headers)
+        assert res.status_code == 200
+        seen += [g["id"] for g in res.json()]
+        cursor = res.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == [ids[2], ids[1], ids[0]]  # dated first, then undated by id
+    # NULL placement is spelled out rather than left to the database's default
+    assert sql_statements.matching("ORDER BY grocery_lists.created_at IS NULL, grocery_lists.created_at DESC")
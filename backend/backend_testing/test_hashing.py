@@ -0,0 +1,61 @@
+# backend_testing/test_hashing.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.hashing import PasswordHasher, _hash_in_worker
+
+
+def _cheap_hasher(**overrides) -> PasswordHasher:
+    params = dict(workers=0, max_pending=4, time_cost=1, memory_cost=1024, parallelism=1)
+    params.update(overrides)
+    return PasswordHasher(**params)
+
+
+def test_inline_hasher_roundtrip_and_timings():
+    hasher = _cheap_hasher()
+    hashed = hasher.hash("securepass")
+    assert "$argon2" in hashed
+    assert "t=1" in hashed and "m=1024" in hashed
+    assert hasher.verify("securepass", hashed)
+    assert not hasher.verify("wrong", hashed)
+    assert not hasher.verify("securepass", "not-a-hash")
+
+    stats = hasher.stats()
+    assert stats["hash_seconds"]["count"] == 1
+    assert stats["verify_seconds"]["count"] == 3
+    assert stats["pending"] == 0
+
+
+def test_process_pool_hasher_async_roundtrip():
+    hasher = _cheap_hasher(workers=1)
+    try:
+        hashed = asyncio.run(hasher.hash_async("securepass"))
+        assert asyncio.run(hasher.verify_async("securepass", hashed))
+    finally:
+        hasher.shutdown()
+
+
+def test_hasher_rejects_when_queue_full():
+    hasher = _cheap_hasher(workers=1, max_pending=1)
+    try:
+        first = hasher._submit("hash", _hash_in_worker, "securepass")
+        with pytest.raises(HTTPException) as exc:
+            hasher.hash("another")
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"] == "1"
+        assert hasher.stats()["rejected"] == 1
+        first.result()
+    finally:
+        hasher.shutdown()
+
+
+def test_pending_count_settles_under_concurrent_use():
+    hasher = _cheap_hasher(max_pending=64)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda n: hasher.hash(f"password-{n}"), range(64)))
+    assert hasher.stats()["pending"] == 0
+    assert hasher.stats()["hash_seconds"]["count"] == 64
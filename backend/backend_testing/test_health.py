@@ -0,0 +1,79 @@
+# backend_testing/test_health.py
+
+import asyncio
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import main
+from app.health import HealthMonitor, pool_saturation
+
+
+def test_livez_never_touches_the_database(client, sql_statements):
+    res = client.get("/livez")
+    assert res.status_code == 200
+    assert res.json() == {"status": "alive"}
+    assert sql_statements.statements == []
+
+
+def test_readyz_and_health_are_served_from_the_cached_probe(client, sql_statements):
+    ready = client.get("/readyz")
+    health = client.get("/health")
+    assert ready.status_code == 200
+    body = ready.json()
+    assert body["status"] == "ready"
+    assert body["database"]["ok"] is True
+    assert "saturation" in body["pool"]
+    assert health.json() == {"status": "healthy", "database": "connected"}
+    assert sql_statements.statements == []  # the startup probe already ran; requests only read its result
+
+
+def test_monitor_reports_database_failure_and_staleness(monkeypatch):
+    now = [100.0]
+    engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+    monitor = HealthMonitor(engine=engine, upstream=None, interval=5, clock=lambda: now[0])
+
+    async def scenario():
+        ready, status = await monitor.readiness()  # no background task: checks inline once
+        assert ready and status["upstream"]["ok"] is None
+
+        now[0] += 16  # older than three intervals
+        monitor._task = object()  # pretend the probe task is running but stuck
+        ready, status = await monitor.readiness()
+        assert not ready and status["status"] == "not_ready"
+        monitor._task = None
+
+        async def broken():
+            raise RuntimeError("connection refused")
+
+        monkeypatch.setattr(monitor, "_select_one", broken)
+        ready, status = await monitor.readiness()
+        assert not ready
+        assert status["database"]["error"] == "connection refused"
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_upstream_probe_result_does_not_affect_readiness(stub_mealdb):
+    upstream = stub_mealdb(lambda request: httpx.Response(503), install=False)
+    engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+    monitor = HealthMonitor(engine=engine, upstream=upstream)
+
+    async def scenario():
+        await monitor.check()
+        ready, status = await monitor.readiness()
+        await upstream.close()
+        await engine.dispose()
+        return ready, status
+
+    ready, status = asyncio.run(scenario())
+    assert ready
+    assert status["upstream"]["ok"] is False
+    assert "503" in status["upstream"]["error"]
+
+
+def test_pool_saturation():
+    assert pool_saturation({"size": 5, "max_overflow": 5, "checked_out": 5}) == 0.5
+    assert pool_saturation({"pool_class": "NullPool"}) is None
+    assert "health_probe" in main.internal_stats()
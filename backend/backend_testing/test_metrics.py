@@ -0,0 +1,76 @@
+# backend_testing/test_metrics.py
+
+import logging
+
+from sqlalchemy import text
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.database import AsyncSessionLocal, SlowQueryLog, normalize_sql
+from app.metrics import MetricsMiddleware, RequestMetrics, RequestStats, request_metrics
+
+
+def test_render_prometheus_text():
+    metrics = RequestMetrics(buckets=(0.1, 1.0))
+    metrics.observe("GET", "/api/pantry/", 200, 0.05, RequestStats(db_seconds=0.01, db_queries=2))
+    metrics.observe("GET", "/api/pantry/", 304, 0.5, RequestStats(db_seconds=0.2, db_queries=1))
+
+    text = metrics.render_prometheus()
+    assert 'http_requests_total{method="GET",route="/api/pantry/",status="200"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/pantry/",le="0.1"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/pantry/",le="+Inf"} 2' in text
+    assert 'http_request_db_queries_total{method="GET",route="/api/pantry/"} 3' in text
+    assert "http_request_upstream_seconds_bucket" not in text  # no upstream calls recorded
+
+
+def test_metrics_endpoint_records_route_templates_and_db_time(client, auth_headers):
+    headers = auth_headers("metrics@example.com")
+
+    client.get("/api/pantry/", headers=headers)
+    client.delete("/api/pantry/424242", headers=headers)
+    client.get("/no/such/path")
+
+    key = ("DELETE", "/api/pantry/{ingredient_id}")
+    assert request_metrics.requests[(*key, "404")] >= 1
+    assert request_metrics.db_queries[("GET", "/api/pantry/")] >= 2
+    assert request_metrics.db_time[("GET", "/api/pantry/")].sum > 0
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/pantry/{ingredient_id}",status="404"' in res.text
+    assert 'route="unmatched",status="404"' in res.text
+
+
+def test_normalize_sql_groups_statements_by_shape():
+    assert normalize_sql(
+        "SELECT id FROM favorites\n  WHERE user_id = 42 AND recipe_id IN (?, ?, ?) AND name = 'O''Brien'"
+    ) == "SELECT id FROM favorites WHERE user_id = ? AND recipe_id IN (...) AND name = ?"
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)") == "INSERT INTO t (a, b) VALUES (...), ..."
+
+
+def test_slow_query_log_reports_normalized_statements(caplog):
+    slow_log = SlowQueryLog(threshold_seconds=0.1)
+    with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+        slow_log.observe("SELECT * FROM users WHERE id = 1", 0.05)
+        slow_log.observe("SELECT * FROM users WHERE id = 1", 0.25)
+        slow_log.observe("SELECT * FROM users WHERE id = 2", 0.3)
+
+    assert slow_log.stats()["count"] == 2
+    assert slow_log.stats()["top_statements"] == {"SELECT * FROM users WHERE id = ?": 2}
+    assert "250.0 ms" in caplog.records[0].getMessage()
+
+
+def test_debug_headers_report_queries_and_db_time():
+    async def endpoint(request):
+        async with AsyncSessionLocal() as session:
+            await session.execute(text("SELECT 1"))
+            await session.execute(text("SELECT 2"))
+        return PlainTextResponse("ok")
+
+    app = MetricsMiddleware(Starlette(routes=[Route("/", endpoint)]), RequestMetrics(), debug_headers=True)
+    res = TestClient(app).get("/")
+    assert res.headers["x-db-queries"] == "2"
+    assert res.headers["x-db-time"].endswith("ms")
@@ -1,5 +1,10 @@
 # backend_testing/test_models.py
 
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import Base
+from app.migrate import create_missing_indexes
+from app.payloads import upgrade_schema
 from app.models.user import User
 from app.models.user_preference import UserPreference
 from app.models.ingredient import UserIngredient
@@ -97,3 +102,48 @@ def test_user_ingredient_relationship_to_user(db):
     assert ingredient.user == user
     if hasattr(user, "ingredients"):
         assert ingredient in user.ingredients
+
+
+def test_migrate_creates_indexes_missing_from_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:  # as a database created before the index existed
+        conn.execute(text("DROP INDEX ix_grocery_lists_user_id_created_at"))
+
+    assert create_missing_indexes(engine, dry_run=True) == [
+        "CREATE INDEX ix_grocery_lists_user_id_created_at ON grocery_lists (user_id, created_at)"
+    ]
+    create_missing_indexes(engine)
+    names = {index["name"] for index in inspect(engine).get_indexes("grocery_lists")}
+    assert "ix_grocery_lists_user_id_created_at" in names
+    assert create_missing_indexes(engine) == []
+    engine.dispose()
+
+
+def test_payload_upgrade_rebuilds_legacy_sqlite_favorites(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    tables = [t for t in Base.metadata.sorted_tables if t.name != "favorites"]
+    Base.metadata.create_all(engine, tables=tables)
+    with engine.begin() as conn:  # favorites as created before shared payloads
+        conn.execute(text(
+            "CREATE TABLE favorites (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES users (id), "
+            "recipe_id VARCHAR(50) NOT NULL, recipe_json JSON NOT NULL, created_at DATETIME, updated_at DATETIME, "
+            "CONSTRAINT uq_user_recipe UNIQUE (user_id, recipe_id))"
+        ))
+        conn.execute(text("CREATE INDEX ix_favorites_user_id ON favorites (user_id)"))
+        conn.execute(text("INSERT INTO favorites (id, user_id, recipe_id, recipe_json) VALUES (7, 1, '52772', '{\"a\": 1}')"))
+
+    # The payload_id index waits for its column instead of failing
+    assert not any("payload_id" in ddl for ddl in create_missing_indexes(engine, dry_run=True))
+
+    upgrade_schema(engine)
+    columns = {c["name"]: c for c in inspect(engine).get_columns("favorites")}
+    assert columns["recipe_json"]["nullable"] and "payload_id" in columns
+    indexes = {index["name"] for index in inspect(engine).get_indexes("favorites")}
+    assert {"ix_favorites_payload_id", "ix_favorites_user_id", "ix_favorites_recipe_id"} <= indexes
+    assert [u["name"] for u in inspect(engine).get_unique_constraints("favorites")] == ["uq_user_recipe"]
+    with engine.connect() as conn:
+        row = conn.execute(text("SELECT id, recipe_id, recipe_json, payload_id FROM favorites")).one()
+    assert tuple(row) == (7, "52772", '{"a": 1}', None)
+    assert create_missing_indexes(engine) == []
+    engine.dispose()
@@ -1,17 +1,6 @@
 # backend_testing/test_pantry.py
 
-from app.models.user import User
 from app.models.ingredient import UserIngredient
-from app.security import create_access_token
-
-
-def _auth_headers_for_email(email: str) -> dict:
-    """
-    Helper that creates a JWT whose `sub` claim is the user's email,
-    matching get_current_user() logic in app.security.
-    """
-    token = create_access_token({"sub": email})
-    return {"Authorization": f"Bearer {token}"}
 
 
 # def test_add_ingredient(client, db):
@@ -67,17 +56,8 @@ def _auth_headers_for_email(email: str) -> dict:
 #     assert body[0]["user_id"] == user.id
 
 
-def test_remove_ingredient(client, db):
-    user = User(
-        username="pantryuser3",
-        email="pantry3@example.com",
-        password_hash="hash",
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-
-    headers = _auth_headers_for_email(user.email)
+def test_remove_ingredient(client, auth_headers):
+    headers = auth_headers("pantry3@example.com")
 
     # Add first
     add_res = client.post(
@@ -111,3 +91,78 @@ def test_pantry_requires_auth_for_add(client):
         json={"ingredient_name": "Carrot"},
     )
     assert res.status_code in (401, 403)
+
+
+def test_bulk_add_ignores_duplicates(client, db, auth_headers):
+    headers = auth_headers("bulk@example.com")
+    client.post("/api/pantry/", json={"ingredient_name": "Rice"}, headers=headers)
+
+    res = client.post(
+        "/api/pantry/bulk",
+        json={"ingredient_names": ["Rice", "Beans", " Beans ", "", "Corn"]},
+        headers=headers,
+    )
+    assert res.status_code == 200
+    assert sorted(i["ingredient_name"] for i in res.json()) == ["Beans", "Corn", "Rice"]
+
+    listing = client.get("/api/pantry/", headers=headers).json()
+    assert len(listing) == 3
+
+
+def test_bulk_delete_returns_remaining_rows(client, db, auth_headers):
+    headers = auth_headers("bulkdel@example.com")
+    added = client.post(
+        "/api/pantry/bulk", json={"ingredient_names": ["Salt", "Pepper", "Oil"]}, headers=headers
+    ).json()
+    ids = {i["ingredient_name"]: i["id"] for i in added}
+
+    res = client.request(
+        "DELETE",
+        "/api/pantry/bulk",
+        json={"ingredient_ids": [ids["Salt"], ids["Oil"], 999999]},
+        headers=headers,
+    )
+    assert res.status_code == 200
+    assert [i["ingredient_name"] for i in res.json()] == ["Pepper"]
+
+
+def test_bulk_add_rejects_empty_and_oversized_requests(client, db, auth_headers):
+    from app.config import settings
+
+    headers = auth_headers("bulklimit@example.com")
+    assert client.post("/api/pantry/bulk", json={"ingredient_names": []}, headers=headers).status_code == 400
+
+    too_many = [f"item{i}" for i in range(settings.PANTRY_BULK_MAX_ITEMS + 1)]
+    res = client.post("/api/pantry/bulk", json={"ingredient_names": too_many}, headers=headers)
+    assert res.status_code == 422
+    assert res.json()["detail"][0]["type"] == "too_long"
+
+
+def test_pantry_etag_revalidation_and_bump_on_write(client, db, auth_headers):
+    headers = auth_headers("etag@example.com")
+    client.post("/api/pantry/", json={"ingredient_name": "Rice"}, headers=headers)
+
+    first = client.get("/api/pantry/", headers=headers)
+    etag = first.headers["etag"]
+    cached = client.get("/api/pantry/", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    client.post("/api/pantry/bulk", json={"ingredient_names": ["Beans"]}, headers=headers)
+    changed = client.get("/api/pantry/", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 2
+
+
+def test_pantry_keyset_pagination(client, db, auth_headers):
+    headers = auth_headers("pages@example.com")
+    client.post("/api/pantry/bulk", json={"ingredient_names": ["A", "B", "C"]}, headers=headers)
+
+    page1 = client.get("/api/pantry/?limit=2", headers=headers)
+    assert [i["ingredient_name"] for i in page1.json()] == ["A", "B"]
+    after = page1.headers["x-next-after-id"]
+
+    page2 = client.get(f"/api/pantry/?limit=2&after_id={after}", headers=headers)
+    assert [i["ingredient_name"] for i in page2.json()] == ["C"]
+    assert "x-next-after-id" not in page2.headers
@@ -0,0 +1,44 @@
+# backend_testing/test_preferences.py
+
+from app.preference_store import preference_cache
+
+
+def _preference_statements(client, sql_statements, method, url, headers, **kwargs):
+    sql_statements.clear()
+    res = client.request(method, url, headers=headers, **kwargs)
+    assert res.status_code == 200
+    return res, [s.split()[0].upper() for s in sql_statements.matching("user_preferences")]
+
+
+def test_save_writes_only_the_difference(client, db, sql_statements, auth_headers):
+    headers = auth_headers("prefdiff@example.com")
+    _, first = _preference_statements(
+        client, sql_statements, "POST", "/api/preferences/", headers, json={"preferences": ["vegan", "nut_free"]}
+    )
+    assert first == ["SELECT", "INSERT"]
+
+    _, unchanged = _preference_statements(
+        client, sql_statements, "POST", "/api/preferences/", headers, json={"preferences": ["nut_free", "vegan", " "]}
+    )
+    assert unchanged == ["SELECT"]
+
+    _, changed = _preference_statements(
+        client, sql_statements, "POST", "/api/preferences/", headers, json={"preferences": ["vegan", "gluten_free"]}
+    )
+    assert changed == ["SELECT", "DELETE", "INSERT"]
+
+    res, reads = _preference_statements(client, sql_statements, "GET", "/api/preferences/me", headers)
+    assert res.json() == {"preferences": ["vegan", "gluten_free"]}
+    assert reads == []  # served from the cache
+
+
+def test_cache_miss_reads_preferences_once(client, db, sql_statements, auth_headers):
+    headers = auth_headers("prefcache@example.com")
+    client.post("/api/preferences/", json={"preferences": ["dairy_free"]}, headers=headers)
+    preference_cache.clear()
+
+    _, first = _preference_statements(client, sql_statements, "GET", "/api/preferences/me", headers)
+    res, second = _preference_statements(client, sql_statements, "GET", "/api/preferences/me", headers)
+    assert first == ["SELECT"]
+    assert second == []
+    assert res.json()["preferences"] == ["dairy_free"]
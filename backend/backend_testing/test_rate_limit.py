@@ -0,0 +1,90 @@
+# backend_testing/test_rate_limit.py
+
+import asyncio
+
+from app.rate_limit import MemoryBucketStore, RateLimit, RateLimiter, RateLimitRule
+
+
+def test_parse_limits():
+    assert RateLimit.parse("20/60") == RateLimit(20, 60.0)
+    assert RateLimit.parse("5") == RateLimit(5, 60.0)
+    assert RateLimit.parse("") is None
+    assert RateLimit.parse("0") is None
+
+
+def test_memory_bucket_refills_over_time(fake_clock):
+    store = MemoryBucketStore(clock=fake_clock)
+    limit = RateLimit(2, 10)
+
+    async def scenario():
+        assert await store.take("k", limit) == 0
+        assert await store.take("k", limit) == 0
+        assert await store.take("k", limit) == 5.0  # one token every 5 seconds
+        fake_clock.now = 5.0
+        assert await store.take("k", limit) == 0
+        assert await store.take("other", limit) == 0  # buckets are per key
+
+    asyncio.run(scenario())
+
+
+def test_limiter_applies_ip_and_account_buckets():
+    rule = RateLimitRule("login", "POST", "/api/login", per_ip=RateLimit(3, 60), per_account=RateLimit(1, 60))
+    limiter = RateLimiter(MemoryBucketStore(), [rule])
+    assert limiter.match("POST", "/api/login/") is rule
+    assert limiter.match("GET", "/api/login") is None
+
+    async def scenario():
+        assert await limiter.check(rule, "1.1.1.1", "a@example.com") == 0
+        assert await limiter.check(rule, "1.1.1.1", "a@example.com") > 0  # account bucket empty
+        assert await limiter.check(rule, "1.1.1.1", "b@example.com") == 0
+        assert await limiter.check(rule, "1.1.1.1", "c@example.com") > 0  # ip bucket empty
+
+    asyncio.run(scenario())
+    assert limiter.stats()["limited"] == {"login": 2}
+    # rejected by the IP bucket before the account bucket was touched
+    assert "login:account:c@example.com" not in limiter.store._buckets
+
+
+def test_account_bucket_can_be_scoped_to_the_client_ip():
+    rule = RateLimitRule("login", "POST", "/api/login", per_account=RateLimit(1, 60), account_per_ip=True)
+    limiter = RateLimiter(MemoryBucketStore(), [rule])
+
+    async def scenario():
+        assert await limiter.check(rule, "6.6.6.6", "victim@example.com") == 0
+        assert await limiter.check(rule, "6.6.6.6", "victim@example.com") > 0
+        # the attacker's failures do not lock the victim out from their own address
+        assert await limiter.check(rule, "1.1.1.1", "victim@example.com") == 0
+
+    asyncio.run(scenario())
+
+
+def test_login_is_limited_per_account_with_retry_after(client):
+    form = {"username": "Nobody@Example.com", "password": "wrongpass"}
+    statuses = [client.post("/api/login", data=form).status_code for _ in range(10)]
+    assert set(statuses) == {401}
+
+    res = client.post("/api/login", data={**form, "username": "nobody@example.com"})
+    assert res.status_code == 429
+    assert int(res.headers["retry-after"]) >= 1
+
+    # a different account from the same client is still allowed
+    assert client.post("/api/login", data={**form, "username": "other@example.com"}).status_code == 401
+
+
+def test_support_aliases_share_one_ip_bucket(client):
+    body = {"name": "Ann", "message": "hi"}
+    statuses = [
+        client.post(url, json={**body, "email": f"ann{n}@example.com"}).status_code
+        for n, url in enumerate(["/api/support/send_message", "/support/send_message"] * 3)
+    ]
+    assert statuses == [202] * 5 + [429]
+
+
+def test_rate_limited_responses_carry_cors_headers(client):
+    origin = {"Origin": "http://localhost:5500"}
+    body = {"name": "Cy", "message": "hi"}
+    for n in range(5):
+        client.post("/api/support/send_message", json={**body, "email": f"cy{n}@example.com"}, headers=origin)
+    res = client.post("/api/support/send_message", json={**body, "email": "cy5@example.com"}, headers=origin)
+    assert res.status_code == 429
+    assert res.headers["access-control-allow-origin"] == "http://localhost:5500"
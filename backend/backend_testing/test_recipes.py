@@ -0,0 +1,232 @@
+# backend_testing/test_recipes.py
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.models.ingredient import UserIngredient
+from app.models.user_preference import UserPreference
+from app.models.user import User
+from app.upstream import UpstreamError
+
+FILTER_BY_INGREDIENT = {
+    "garlic": [
+        {"idMeal": "1", "strMeal": "Garlic Bread", "strMealThumb": "a.jpg"},
+        {"idMeal": "2", "strMeal": "Tomato Soup", "strMealThumb": "b.jpg"},
+    ],
+    "tomato": [
+        {"idMeal": "2", "strMeal": "Tomato Soup", "strMealThumb": "b.jpg"},
+        {"idMeal": "3", "strMeal": "Bruschetta", "strMealThumb": "c.jpg"},
+    ],
+    "chicken_breast": None,
+}
+
+
+@pytest.fixture()
+def mealdb(stub_mealdb):
+    """Replace the shared TheMealDB client with one backed by an in-process stub."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        ingredient = request.url.params.get("i")
+        return httpx.Response(200, json={"meals": FILTER_BY_INGREDIENT.get(ingredient)})
+
+    stub_mealdb(handler)
+    return calls
+
+
+@pytest.fixture()
+def pantry_user(db, auth_headers):
+    """Factory: a user with these pantry ingredients; returns their auth headers."""
+
+    def make(email: str, ingredients: list[str]) -> dict:
+        headers = auth_headers(email)
+        user_id = db.query(User.id).filter(User.email == email).scalar()
+        db.add_all(UserIngredient(user_id=user_id, ingredient_name=name) for name in ingredients)
+        db.commit()
+        return headers
+
+    return make
+
+
+def test_search_merges_and_ranks_by_pantry_matches(client, db, pantry_user, mealdb):
+    headers = pantry_user("search@example.com", ["Garlic", "tomato", "Chicken Breast"])
+
+    res = client.get("/api/recipes/search", headers=headers)
+    assert res.status_code == 200
+    body = res.json()
+
+    assert len(mealdb) == 3  # one upstream call per pantry ingredient
+    assert body["total"] == 3
+    assert [m["idMeal"] for m in body["meals"]] == ["2", "3", "1"]
+    assert body["meals"][0]["matchCount"] == 2
+    assert body["meals"][0]["matchedIngredient"] == "Garlic, tomato"
+
+
+def test_search_applies_dietary_preferences(client, db, pantry_user, mealdb):
+    headers = pantry_user("search5@example.com", ["garlic", "tomato"])
+    user_id = db.query(User.id).filter(User.email == "search5@example.com").scalar()
+    db.add(UserPreference(user_id=user_id, preference_type="gluten_free"))
+    db.commit()
+
+    res = client.get("/api/recipes/search", headers=headers)
+    assert [m["idMeal"] for m in res.json()["meals"]] == ["2", "3"]  # "Garlic Bread" excluded
+
+
+def test_search_skips_upstream_meals_without_id(client, db, pantry_user, stub_mealdb):
+    headers = pantry_user("search6@example.com", ["leek"])
+    stub_mealdb(lambda request: httpx.Response(200, json={"meals": [
+        {"strMeal": "No Id Pie"},
+        {"idMeal": "9", "strMeal": "Leek Soup", "strMealThumb": "l.jpg"},
+    ]}))
+
+    res = client.get("/api/recipes/search", headers=headers)
+    assert res.status_code == 200
+    assert [m["idMeal"] for m in res.json()["meals"]] == ["9"]
+
+
+def test_search_paginates(client, db, pantry_user, mealdb):
+    headers = pantry_user("search2@example.com", ["garlic", "tomato"])
+
+    res = client.get("/api/recipes/search?page=2&page_size=2", headers=headers)
+    body = res.json()
+    assert body["total"] == 3
+    assert [m["idMeal"] for m in body["meals"]] == ["1"]
+
+
+def test_search_with_empty_pantry_skips_upstream(client, db, pantry_user, mealdb):
+    headers = pantry_user("search3@example.com", [])
+
+    res = client.get("/api/recipes/search", headers=headers)
+    assert res.status_code == 200
+    assert res.json()["meals"] == []
+    assert mealdb == []
+
+
+def test_search_reuses_cached_upstream_responses(client, db, pantry_user, mealdb):
+    headers = pantry_user("search4@example.com", ["garlic", "tomato"])
+
+    client.get("/api/recipes/search", headers=headers)
+    client.get("/api/recipes/search", headers=headers)
+    assert len(mealdb) == 2  # second search served from the response cache
+
+
+def test_mealdb_client_serves_stale_while_revalidating(stub_mealdb):
+    responses = iter([{"meals": ["v1"]}, {"meals": ["v2"]}])
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(200, json=next(responses))
+
+    now = [1000.0]
+    mealdb_client = stub_mealdb(handler, install=False, ttl=10, stale_ttl=100, clock=lambda: now[0])
+
+    async def scenario():
+        assert await mealdb_client.get_json("filter.php", {"c": "Vegan"}) == {"meals": ["v1"]}
+        now[0] += 50  # stale but inside the revalidate window
+        assert await mealdb_client.get_json("filter.php", {"c": "Vegan"}) == {"meals": ["v1"]}
+        await asyncio.gather(*mealdb_client._refreshing.values())
+        assert await mealdb_client.get_json("filter.php", {"c": "Vegan"}) == {"meals": ["v2"]}
+        await mealdb_client.close()
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+    assert mealdb_client.stats()["stale_served"] == 1
+
+
+def test_mealdb_client_does_not_cache_errors(stub_mealdb):
+    statuses = iter([500, 200])
+
+    def handler(request):
+        return httpx.Response(next(statuses), json={"meals": []})
+
+    mealdb_client = stub_mealdb(handler, install=False)
+
+    async def scenario():
+        with pytest.raises(UpstreamError) as exc:
+            await mealdb_client.get_json("filter.php", {"c": "Vegan"})
+        assert exc.value.status_code == 500
+        assert await mealdb_client.get_json("filter.php", {"c": "Vegan"}) == {"meals": []}
+
+    asyncio.run(scenario())
+
+
+def test_mealdb_client_rejects_a_non_json_200(stub_mealdb):
+    mealdb_client = stub_mealdb(lambda request: httpx.Response(200, text="<html>Maintenance</html>"), install=False)
+
+    async def scenario():
+        with pytest.raises(UpstreamError) as exc:
+            await mealdb_client.get_json("filter.php", {"c": "Vegan"})
+        assert "not valid JSON" in str(exc.value)
+
+    asyncio.run(scenario())
+
+
+def test_upstream_failures_become_502_with_a_reason(client, pantry_user, stub_mealdb):
+    headers = pantry_user("upstreamdown@example.com", ["Garlic"])
+
+    def unreachable(request):
+        raise httpx.ConnectError("connection refused")
+
+    stub_mealdb(unreachable)
+    res = client.get("/api/recipes/recommendations", headers=headers)
+    assert res.status_code == 502
+    assert "Could not reach TheMealDB" in res.json()["detail"]
+    assert "None" not in res.json()["detail"]
+
+    stub_mealdb(lambda request: httpx.Response(200, text="oops"))
+    res = client.get("/api/recipes/recommendations", headers=headers)
+    assert res.status_code == 502
+    assert "not valid JSON" in res.json()["detail"]
+    assert client.get("/api/recipes/search", headers=headers).status_code == 502
+
+
+def test_concurrent_cold_requests_share_one_upstream_call(stub_mealdb):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"meals": [{"idMeal": "1"}]})
+
+    mealdb_client = stub_mealdb(handler, install=False)
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(mealdb_client.get_json("filter.php", {"c": "Seafood"}) for _ in range(10))
+        )
+        await mealdb_client.close()
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(r == {"meals": [{"idMeal": "1"}]} for r in results)
+
+    flights = mealdb_client.stats()["single_flight"]
+    assert flights["flights"] == 1
+    assert flights["coalesced"] == 9
+    assert flights["top_coalesced_keys"] == {"filter.php?c=Seafood": 9}
+
+
+def test_single_flight_shares_errors_and_then_retries(stub_mealdb):
+    statuses = iter([503, 200])
+
+    async def handler(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(next(statuses), json={"meals": []})
+
+    mealdb_client = stub_mealdb(handler, install=False)
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(mealdb_client.get_json("filter.php", {"c": "Beef"}) for _ in range(3)),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, UpstreamError) for r in results)
+        # The failed flight is gone, so the next call goes upstream again
+        assert await mealdb_client.get_json("filter.php", {"c": "Beef"}) == {"meals": []}
+
+    asyncio.run(scenario())
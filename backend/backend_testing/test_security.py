@@ -31,3 +31,41 @@ def test_decode_invalid_token_raises_http_exception():
     """Decoding a nonsense token should raise HTTPException."""
     with pytest.raises(HTTPException):
         decode_token("this.is.not.a.valid.jwt")
+
+
+def test_get_current_user_caches_principal(client, db, auth_headers):
+    """A second authenticated request should be served from the principal cache."""
+    from app.models.user import User
+    from app.security import principal_cache
+
+    headers = auth_headers("cache@example.com")
+    user = db.query(User).filter(User.email == "cache@example.com").one()
+    principal_cache.invalidate(user.email)
+    hits_before = principal_cache.hits
+
+    assert client.get("/api/pantry/", headers=headers).status_code == 200
+    assert client.get("/api/pantry/", headers=headers).status_code == 200
+
+    assert principal_cache.get(user.email).id == user.id
+    assert principal_cache.hits >= hits_before + 1
+
+
+def test_principal_cache_invalidated_on_user_change(db):
+    """Renaming or deleting a user must evict its cached principal."""
+    from app.models.user import User
+    from app.security import CurrentUser, principal_cache
+
+    user = User(username="renameme", email="rename@example.com", password_hash="hash")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+    principal_cache.set(user.email, CurrentUser.from_user(user))
+    user.username = "renamed"
+    db.commit()
+    assert principal_cache.get(user.email) is None
+
+    principal_cache.set(user.email, CurrentUser.from_user(user))
+    db.delete(user)
+    db.commit()
+    assert principal_cache.get("rename@example.com") is None
@@ -0,0 +1,37 @@
+# backend_testing/test_serialization.py
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import orjson
+
+from app.config import settings
+from app.schemas.grocery_list import GroceryListResponse
+from app.schemas.pantry import IngredientResponse
+from app.serialization import dump, dump_trusted, orm_response
+
+
+def _grocery_list():
+    items = [SimpleNamespace(id=n, ingredient_name=f"item {n}", grocery_list_id=1) for n in range(3)]
+    return SimpleNamespace(id=1, user_id=7, name="Weekly", created_at=datetime(2025, 1, 2, 3, 4, 5, 6), items=items)
+
+
+def test_trusted_output_matches_validated_output(monkeypatch):
+    row = SimpleNamespace(id=3, ingredient_name="Rice", created_at=datetime(2025, 1, 2), user_id=9)
+    grocery = _grocery_list()
+
+    trusted = [dump(IngredientResponse, row), dump(GroceryListResponse, grocery)]
+    monkeypatch.setattr(settings, "TRUSTED_OUTPUT", False)
+    validated = [dump(IngredientResponse, row), dump(GroceryListResponse, grocery)]
+
+    assert orjson.loads(orjson.dumps(trusted)) == validated
+    # only schema fields are copied
+    assert "user_id" not in dump_trusted(IngredientResponse, row)
+
+
+def test_orm_response_renders_lists_with_headers():
+    res = orm_response(GroceryListResponse, [_grocery_list()], headers={"X-Next-Cursor": "c"})
+    assert res.headers["x-next-cursor"] == "c"
+    body = orjson.loads(res.body)
+    assert body[0]["created_at"] == "2025-01-02T03:04:05.000006"
+    assert [i["ingredient_name"] for i in body[0]["items"]] == ["item 0", "item 1", "item 2"]
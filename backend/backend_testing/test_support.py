@@ -1,7 +1,14 @@
 # backend_testing/test_support.py
 
+import asyncio
+
+import pytest
+
+from app.models.support_message import SupportMessage
 from app.models.user import User
+from app.routers import support
 from app.security import create_access_token
+from app.write_behind import SupportMessageQueue
 
 
 def _auth_headers_for_user(user_id: int) -> dict:
@@ -68,3 +75,73 @@ def _auth_headers_for_user(user_id: int) -> dict:
 #     res_get = client.get("/api/support/")
 #     assert res_post.status_code in (401, 403)
 #     assert res_get.status_code in (401, 403)
+
+
+@pytest.fixture()
+def queue(monkeypatch):
+    """A fresh, not-started queue in place of the app's, so flushes happen only when the test says."""
+    fresh = SupportMessageQueue(max_pending=3, batch_size=2, interval=60)
+    monkeypatch.setattr(support, "support_queue", fresh)
+    return fresh
+
+
+def test_send_message_is_queued_and_written_in_batches(client, db, queue):
+    for n, url in enumerate(["/api/support/send_message", "/support/send_message", "/api/support/send_message"]):
+        res = client.post(url, json={"name": f"Sam {n}", "email": "sam@example.com", "message": f"Hello {n}"})
+        assert res.status_code == 202
+    assert len(queue) == 3
+    assert db.query(SupportMessage).filter(SupportMessage.email == "sam@example.com").count() == 0
+
+    assert asyncio.run(queue.flush()) == 3
+    stored = db.query(SupportMessage).filter(SupportMessage.email == "sam@example.com").order_by(SupportMessage.id).all()
+    assert [m.message for m in stored] == ["Hello 0", "Hello 1", "Hello 2"]
+    assert queue.stats()["flushed_rows"] == 3
+
+
+def test_full_queue_returns_503(client, queue):
+    body = {"name": "Spam", "email": "spam@example.com", "message": "buy now"}
+    statuses = [client.post("/api/support/send_message", json=body).status_code for _ in range(4)]
+    assert statuses == [202, 202, 202, 503]
+    assert queue.stats()["rejected"] == 1
+
+
+def test_stop_drains_queue(db):
+    queue = SupportMessageQueue(batch_size=10, interval=60)
+    queue.offer("Dana", "drain@example.com", "flush me on shutdown")
+
+    async def _lifecycle():
+        queue.start()
+        await queue.stop()
+
+    asyncio.run(_lifecycle())
+    assert len(queue) == 0
+    assert db.query(SupportMessage).filter(SupportMessage.email == "drain@example.com").count() == 1
+
+
+def test_failed_flush_requeues_within_the_bound():
+    queue = SupportMessageQueue(max_pending=3, batch_size=2, interval=60)
+
+    class FailingSession:
+        """Messages keep arriving while the INSERT runs, then it fails."""
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, statement, rows):
+            assert queue.offer("Late", "late@example.com", "arrived during the flush")
+            assert queue.offer("Later", "late@example.com", "arrived during the flush")
+            raise RuntimeError("database is down")
+
+    queue._session_factory = FailingSession
+    queue.offer("Ann", "ann@example.com", "first")
+    queue.offer("Bob", "bob@example.com", "second")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(queue.flush())
+    # The failed batch is back in front; the newest message did not fit
+    assert [m["name"] for m in queue._pending] == ["Ann", "Bob", "Late"]
+    assert queue.stats()["dropped"] == 1
+    assert not queue.offer("Cy", "cy@example.com", "queue is full")
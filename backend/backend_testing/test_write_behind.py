@@ -0,0 +1,43 @@
+# backend_testing/test_write_behind.py
+
+import asyncio
+from datetime import datetime
+
+from app.models.user import User
+from app.write_behind import LastLoginBuffer, last_login_buffer
+
+
+def test_login_does_not_write_last_login_until_flush(client, db):
+    client.post("/api/register", json={
+        "username": "bufferuser", "email": "buffer@example.com", "password": "securepass"
+    })
+    res = client.post("/api/login", data={"username": "buffer@example.com", "password": "securepass"})
+    assert res.status_code == 200
+
+    user = db.query(User).filter(User.email == "buffer@example.com").first()
+    assert user.last_login is None
+    assert len(last_login_buffer) >= 1
+
+    asyncio.run(last_login_buffer.flush())
+    db.expire_all()
+    assert db.query(User).filter(User.email == "buffer@example.com").first().last_login is not None
+
+
+def test_last_login_buffer_coalesces_and_bulk_updates(db):
+    users = [User(username=f"bulk{i}", email=f"bulk{i}@example.com", password_hash="hash") for i in range(3)]
+    db.add_all(users)
+    db.commit()
+
+    buffer = LastLoginBuffer(interval=60)
+    buffer.record(users[0].id, datetime(2024, 1, 1))
+    buffer.record(users[0].id, datetime(2024, 1, 2))  # newer login wins
+    buffer.record(users[1].id, datetime(2024, 1, 3))
+    assert len(buffer) == 2
+
+    assert asyncio.run(buffer.flush()) == 2
+    assert len(buffer) == 0
+
+    db.expire_all()
+    assert db.get(User, users[0].id).last_login == datetime(2024, 1, 2)
+    assert db.get(User, users[1].id).last_login == datetime(2024, 1, 3)
+    assert db.get(User, users[2].id).last_login is None
@@ -0,0 +1,280 @@
+"""
+Synthetic, realistically skewed data for load, index and query-plan testing.
+
+    cd backend && python -m benchmarks.dataset --database-url sqlite:///./large.db
+        [--users 100000] [--batch-size 2000] [--seed 1]
+
+Fills users, user_ingredients, user_preferences, recipe_payloads, favorites,
+grocery_lists / grocery_list_items and support_messages through the app's
+models, one multi-row executemany INSERT per table per batch of users (one
+transaction per batch), so memory stays flat and millions of rows load in
+minutes rather than hours.
+
+Shapes:
+  - ingredient popularity is Zipfian (--zipf-s): a few staples appear in most
+    pantries, the long tail in very few;
+  - recipe popularity for favorites is Zipfian too;
+  - pantry size and favorites per user are heavy-tailed (Pareto, --pantry-alpha
+    / --favorites-alpha): most users have a few, some have hundreds.
+
+All generated accounts share the password GENERATED_PASSWORD, so the
+benchmarks (or a person) can log in as any of them. Ids continue after the
+existing rows, so the generator can be run repeatedly against one database.
+"""
+
+import argparse
+import bisect
+import itertools
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import create_engine, event, func, insert, select
+from sqlalchemy.engine import Engine
+
+from app.database import Base
+from app.models import (
+    FavoriteRecipe, GroceryList, GroceryListItem, RecipePayload, User, UserIngredient, UserPreference,
+)
+from app.models.support_message import SupportMessage
+from app.payloads import prepare_payload
+
+GENERATED_PASSWORD = "bench-password"
+
+# Most common first: Zipf rank 1 is the most popular ingredient
+COMMON_INGREDIENTS = [
+    "salt", "olive oil", "garlic", "onion", "butter", "eggs", "black pepper", "flour", "sugar", "milk",
+    "tomato", "rice", "lemon", "chicken breast", "carrots", "potatoes", "cheddar cheese", "pasta",
+    "soy sauce", "honey", "vegetable oil", "parsley", "ginger", "bell pepper", "beef", "spinach",
+    "mushrooms", "cream", "basil", "cumin", "paprika", "chickpeas", "lime", "bread", "yogurt",
+    "coconut milk", "celery", "oregano", "salmon", "lentils",
+]
+PREFERENCES = ["vegan", "vegetarian", "gluten_free", "nut_free", "dairy_free", "pescatarian"]
+CATEGORIES = ["Beef", "Chicken", "Dessert", "Pasta", "Seafood", "Vegan", "Vegetarian", "Breakfast"]
+
+
+@dataclass
+class DatasetConfig:
+    users: int = 10_000
+    batch_size: int = 2_000
+    ingredients: int = 2_000  # vocabulary size
+    recipes: int = 5_000  # distinct recipes that can be favorited
+    zipf_s: float = 1.1
+    pantry_min: int = 5
+    pantry_alpha: float = 1.5
+    pantry_max: int = 500
+    favorites_scale: float = 3.0
+    favorites_alpha: float = 1.3
+    favorites_max: int = 2_000
+    grocery_lists_mean: float = 2.0
+    support_fraction: float = 0.02
+    history_days: int = 365
+
+
+class ZipfSampler:
+    """Ranks 0..n-1 with P(rank k) proportional to 1 / (k + 1) ** s."""
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.n = n
+        self.rng = rng
+        self._cumulative = list(itertools.accumulate(1 / (k + 1) ** s for k in range(n)))
+
+    def sample(self) -> int:
+        return bisect.bisect_left(self._cumulative, self.rng.random() * self._cumulative[-1])
+
+    def sample_distinct(self, k: int) -> list[int]:
+        """k distinct ranks, popular ones most likely (k is capped at half the vocabulary)."""
+        k = min(k, self.n // 2)
+        chosen: dict[int, None] = {}
+        while len(chosen) < k:
+            chosen.setdefault(self.sample())
+        return list(chosen)
+
+
+def heavy_tail(rng: random.Random, scale: float, alpha: float, maximum: int, minimum: float = 0) -> int:
+    """Pareto-distributed count: minimum + scale * (X - 1), X ~ Pareto(alpha), capped at maximum."""
+    return min(maximum, int(minimum + scale * (rng.paretovariate(alpha) - 1)))
+
+
+def ingredient_names(count: int) -> list[str]:
+    extra = (f"ingredient {n:05d}" for n in range(count - len(COMMON_INGREDIENTS)))
+    return (COMMON_INGREDIENTS + list(extra))[:count]
+
+
+def _next_id(conn, column) -> int:
+    return (conn.scalar(select(func.max(column))) or 0) + 1
+
+
+def _fast_sqlite_load(engine: Engine) -> None:
+    """Trade durability for load speed on SQLite; fine for a throwaway dataset."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.close()
+
+
+class DatasetGenerator:
+    def __init__(self, engine: Engine, config: DatasetConfig, seed: int = 1, password_hash: Optional[str] = None):
+        self.engine = engine
+        self.config = config
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.password_hash = password_hash or "not-a-valid-hash"
+        self.ingredients = ingredient_names(config.ingredients)
+        self.ingredient_ranks = ZipfSampler(len(self.ingredients), config.zipf_s, self.rng)
+        self.recipe_ranks = ZipfSampler(config.recipes, config.zipf_s, self.rng)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.counts: dict[str, int] = {}
+
+    def _timestamp(self, after: Optional[datetime] = None) -> datetime:
+        start = after or self.now - timedelta(days=self.config.history_days)
+        return start + timedelta(seconds=self.rng.uniform(0, (self.now - start).total_seconds()))
+
+    def _insert(self, conn, model, rows: list[dict]) -> None:
+        if rows:
+            conn.execute(insert(model), rows)
+            table = model.__tablename__
+            self.counts[table] = self.counts.get(table, 0) + len(rows)
+
+    # ---- recipes ----
+
+    def _recipe_payloads(self, conn) -> list[tuple[int, str]]:
+        """(payload id, recipe id) for every recipe rank, inserting the payloads not stored yet."""
+        recipe_ids = [str(900_000 + rank) for rank in range(self.config.recipes)]
+        existing = dict(conn.execute(
+            select(RecipePayload.recipe_id, RecipePayload.id).where(RecipePayload.recipe_id.in_(recipe_ids))
+        ).all())
+        missing = [rid for rid in recipe_ids if rid not in existing]
+        for chunk_start in range(0, len(missing), self.config.batch_size):
+            rows = []
+            for recipe_id in missing[chunk_start:chunk_start + self.config.batch_size]:
+                recipe = {
+                    "id": recipe_id,
+                    "name": f"Generated recipe {recipe_id}",
+                    "thumbnail": f"https://img.test/{recipe_id}.jpg",
+                    "category": self.rng.choice(CATEGORIES),
+                    "ingredients": [self.ingredients[r] for r in self.ingredient_ranks.sample_distinct(8)],
+                }
+                rows.append(prepare_payload(recipe_id, recipe))
+            self._insert(conn, RecipePayload, rows)
+        existing.update(conn.execute(
+            select(RecipePayload.recipe_id, RecipePayload.id).where(RecipePayload.recipe_id.in_(missing))
+        ).all() if missing else [])
+        return [(existing[rid], rid) for rid in recipe_ids]
+
+    # ---- users ----
+
+    def _user_batch(self, conn, first_user_id: int, count: int, ids: dict, recipes: list) -> None:
+        cfg, rng = self.config, self.rng
+        users, pantry, preferences, favorites = [], [], [], []
+        lists, items, support = [], [], []
+        for user_id in range(first_user_id, first_user_id + count):
+            created = self._timestamp()
+            email = f"gen-{self.seed}-{user_id}@example.com"
+            users.append({
+                "id": user_id, "username": f"gen{user_id}", "email": email,
+                "password_hash": self.password_hash, "created_at": created,
+            })
+
+            pantry_size = heavy_tail(rng, cfg.pantry_min, cfg.pantry_alpha, cfg.pantry_max, minimum=cfg.pantry_min)
+            for rank in self.ingredient_ranks.sample_distinct(pantry_size):
+                pantry.append({
+                    "user_id": user_id, "ingredient_name": self.ingredients[rank],
+                    "created_at": self._timestamp(created),
+                })
+
+            # About a third of users set dietary preferences
+            if rng.random() < 0.35:
+                for preference in rng.sample(PREFERENCES, rng.randint(1, 2)):
+                    preferences.append({"user_id": user_id, "preference_type": preference})
+
+            favorite_count = heavy_tail(rng, cfg.favorites_scale, cfg.favorites_alpha, cfg.favorites_max)
+            for rank in self.recipe_ranks.sample_distinct(favorite_count):
+                payload_id, recipe_id = recipes[rank]
+                favorites.append({
+                    "user_id": user_id, "recipe_id": recipe_id, "payload_id": payload_id,
+                    "created_at": self._timestamp(created),
+                })
+
+            for _ in range(int(rng.expovariate(1 / cfg.grocery_lists_mean))):
+                list_id = ids["grocery_list"]
+                ids["grocery_list"] += 1
+                lists.append({
+                    "id": list_id, "user_id": user_id, "name": "Weekly shop",
+                    "created_at": self._timestamp(created),
+                })
+                for rank in self.ingredient_ranks.sample_distinct(rng.randint(3, 20)):
+                    items.append({"grocery_list_id": list_id, "ingredient_name": self.ingredients[rank]})
+
+            if rng.random() < cfg.support_fraction:
+                support.append({
+                    "name": f"gen{user_id}", "email": email,
+                    "message": "Generated support message " * rng.randint(1, 20),
+                    "created_at": self._timestamp(created),
+                })
+
+        # Parents before children (foreign keys)
+        self._insert(conn, User, users)
+        self._insert(conn, UserIngredient, pantry)
+        self._insert(conn, UserPreference, preferences)
+        self._insert(conn, FavoriteRecipe, favorites)
+        self._insert(conn, GroceryList, lists)
+        self._insert(conn, GroceryListItem, items)
+        self._insert(conn, SupportMessage, support)
+
+    def run(self, progress: bool = False) -> dict[str, int]:
+        """Generate config.users users and their rows. Returns rows inserted per table."""
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as conn:
+            recipes = self._recipe_payloads(conn)
+            first_user_id = _next_id(conn, User.id)
+            ids = {"grocery_list": _next_id(conn, GroceryList.id)}
+
+        started = time.perf_counter()
+        for offset in range(0, self.config.users, self.config.batch_size):
+            count = min(self.config.batch_size, self.config.users - offset)
+            with self.engine.begin() as conn:
+                self._user_batch(conn, first_user_id + offset, count, ids, recipes)
+            if progress:
+                elapsed = time.perf_counter() - started
+                rows = sum(self.counts.values())
+                print(f"  {offset + count:>9} users, {rows:>11} rows  ({rows / elapsed:,.0f} rows/s)")
+        return dict(self.counts)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    defaults = DatasetConfig()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="e.g. sqlite:///./large.db or mysql+pymysql://...")
+    parser.add_argument("--seed", type=int, default=1)
+    for name, value in vars(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args(argv)
+    config = DatasetConfig(**{name: getattr(args, name) for name in vars(defaults)})
+
+    from app.security import get_password_hash
+
+    engine = create_engine(args.database_url)
+    _fast_sqlite_load(engine)
+    generator = DatasetGenerator(engine, config, seed=args.seed, password_hash=get_password_hash(GENERATED_PASSWORD))
+    print(f"Generating {config.users} users into {engine.url.render_as_string(hide_password=True)}")
+    started = time.perf_counter()
+    counts = generator.run(progress=True)
+    engine.dispose()
+
+    for table, rows in counts.items():
+        print(f"{table:<22} {rows:>11}")
+    print(f"Done in {time.perf_counter() - started:.1f} s; accounts use the password {GENERATED_PASSWORD!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
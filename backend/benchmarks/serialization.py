@@ -0,0 +1,88 @@
+"""
+CPU cost of rendering list responses, old path vs new.
+
+    cd backend && python -m benchmarks.serialization [--rows 50 500] [--requests 200]
+
+"before"  - from_orm/model_validate per row, FastAPI response_model
+            re-validation (serialize_response) and the stdlib JSONResponse;
+            what get_ingredients did before app.serialization existed.
+"validated+orjson" - same validation, rendered with ORJSONResponse.
+"trusted+orjson"   - app.serialization.orm_response (the current path).
+
+Reports CPU time (time.process_time) per request, so the numbers do not
+depend on wall-clock noise from other processes.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.schemas.pantry import IngredientResponse
+from app.serialization import orm_response
+
+RESPONSE_FIELD = create_response_field("Response_get_ingredients", List[IngredientResponse])
+
+
+def make_rows(count: int) -> list:
+    created = datetime(2025, 1, 1, 12, 0, 0)
+    return [
+        SimpleNamespace(id=n, user_id=1, ingredient_name=f"ingredient {n}", created_at=created)
+        for n in range(count)
+    ]
+
+
+async def before(rows) -> bytes:
+    models = [IngredientResponse.model_validate(r) for r in rows]
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=models)
+    return JSONResponse(content).body
+
+
+async def validated_orjson(rows) -> bytes:
+    models = [IngredientResponse.model_validate(r) for r in rows]
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=models)
+    return ORJSONResponse(content).body
+
+
+async def trusted_orjson(rows) -> bytes:
+    return orm_response(IngredientResponse, rows).body
+
+
+VARIANTS = {"before": before, "validated+orjson": validated_orjson, "trusted+orjson": trusted_orjson}
+
+
+async def measure(fn, rows, requests: int) -> float:
+    await fn(rows)  # warm-up (schema/serializer caches)
+    started = time.process_time()
+    for _ in range(requests):
+        await fn(rows)
+    return (time.process_time() - started) / requests
+
+
+async def run(row_counts, requests: int) -> None:
+    print(f"{'rows':>6}  {'variant':<18} {'CPU/request':>12}  {'speedup':>8}")
+    for count in row_counts:
+        rows = make_rows(count)
+        baseline = None
+        for name, fn in VARIANTS.items():
+            per_request = await measure(fn, rows, requests)
+            baseline = baseline or per_request
+            print(f"{count:>6}  {name:<18} {per_request * 1000:>9.3f} ms  {baseline / per_request:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.requests))
+
+
+if __name__ == "__main__":
+    main()